@@ -9,6 +9,8 @@ import pathlib
 import re
 import sys
 
+import utils
+
 
 class FileError(Exception):
     """
@@ -741,9 +743,23 @@ def _grep_files(key, fls, case):
     return result
 
 
+def _file_size(fl):
+    """
+    Returns file size in bytes or zero if it cannot be read.
+
+    :param fl: file to measure
+    :returns: int
+    """
+    try:
+        return os.path.getsize(fl)
+    except OSError:
+        return 0
+
+
 def _grep_process(key, fls, case, count):
     """
-    Searches for a key in multiple files with multiple processes.
+    Searches for a key in multiple files with multiple processes. Files are
+    split into chunks with nearly equal total size, one per process.
 
     :param key: key to search for
     :param fls: files to search through
@@ -751,11 +767,13 @@ def _grep_process(key, fls, case, count):
     :param count: process count
     :returns: list
     """
+    chunks = utils.balance(fls, count, _file_size)
     pool = multiprocessing.Pool(processes=count)
-    starmap = pool.starmap(_grep_file, zip(itertools.repeat(key), fls, itertools.repeat(case)))
+    starmap = pool.starmap(_grep_files, zip(itertools.repeat(key), chunks, itertools.repeat(case)))
     pool.close()
     pool.join()
-    return list(itertools.chain.from_iterable(starmap))
+    order = {fl: idx for idx, fl in enumerate(fls)}
+    return sorted(itertools.chain.from_iterable(starmap), key=lambda match: order[match[1]])  # Keep file order
 
 
 def grep(key, src, pattern=None, recursive=True, case=False, count=1):
@@ -1,3 +1,205 @@
+import fractions
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MODULUS = 2 ** 31 - 1  # Prime for modular elimination, products fit into int64
+BLOCK_SIZE = 64  # Tile edge of the blocked multiply
+STRASSEN_THRESHOLD = 4096  # Smallest dimension that recurses with Strassen, tune with test/benchmark/matrix_multiply.py
+
+
+def multiply_naive(a, b):
+    """
+    Multiplies arrays with a triple loop. Reference for benchmarks.
+
+    :param a, b: arrays to multiply
+    :return: ndarray
+    """
+    rows, inner = a.shape
+    cols = b.shape[1]
+    result = np.zeros((rows, cols), dtype=np.result_type(a, b))
+    for r in range(rows):
+        for c in range(cols):
+            sum_ = 0
+            for i in range(inner):
+                sum_ += a[r, i] * b[i, c]
+            result[r, c] = sum_
+    return result
+
+
+def multiply_blocked(a, b, block=BLOCK_SIZE):
+    """
+    Multiplies arrays tile by tile. B is transposed once so both operands
+    are read along contiguous rows.
+
+    :param a, b: arrays to multiply
+    :param block: tile edge
+    :return: ndarray
+    """
+    rows, inner = a.shape
+    cols = b.shape[1]
+    bt = np.ascontiguousarray(b.T)
+    result = np.zeros((rows, cols), dtype=np.result_type(a, b))
+    for r in range(0, rows, block):
+        for c in range(0, cols, block):
+            tile = result[r:r + block, c:c + block]
+            for i in range(0, inner, block):
+                tile += a[r:r + block, i:i + block] @ bt[c:c + block, i:i + block].T
+    return result
+
+
+def multiply_strassen(a, b, threshold=STRASSEN_THRESHOLD, base=np.matmul):
+    """
+    Multiplies arrays with Strassen recursion. Odd dimensions are padded
+    with zeros and products below the threshold use the base multiply.
+
+    :param a, b: arrays to multiply
+    :param threshold: smallest dimension that recurses
+    :param base: multiply for small products
+    :return: ndarray
+    """
+    rows, inner = a.shape
+    cols = b.shape[1]
+    if min(rows, inner, cols) < max(2, threshold):
+        return base(a, b)
+    m, k, n = rows + rows % 2, inner + inner % 2, cols + cols % 2
+    if (m, k, n) != (rows, inner, cols):
+        a = np.pad(a, ((0, m - rows), (0, k - inner)))
+        b = np.pad(b, ((0, k - inner), (0, n - cols)))
+    m, k, n = m // 2, k // 2, n // 2
+    a11, a12, a21, a22 = a[:m, :k], a[:m, k:], a[m:, :k], a[m:, k:]
+    b11, b12, b21, b22 = b[:k, :n], b[:k, n:], b[k:, :n], b[k:, n:]
+    p1 = multiply_strassen(a11 + a22, b11 + b22, threshold, base)
+    p2 = multiply_strassen(a21 + a22, b11, threshold, base)
+    p3 = multiply_strassen(a11, b12 - b22, threshold, base)
+    p4 = multiply_strassen(a22, b21 - b11, threshold, base)
+    p5 = multiply_strassen(a11 + a12, b22, threshold, base)
+    p6 = multiply_strassen(a21 - a11, b11 + b12, threshold, base)
+    p7 = multiply_strassen(a12 - a22, b21 + b22, threshold, base)
+    result = np.empty((2 * m, 2 * n), dtype=p1.dtype)
+    result[:m, :n] = p1 + p4 - p5 + p7
+    result[:m, n:] = p3 + p5
+    result[m:, :n] = p2 + p4
+    result[m:, n:] = p1 - p2 + p3 + p6
+    return result[:rows, :cols]
+
+
+def _attach(name, shape, dtype):
+    """
+    Attaches to a shared memory block as array.
+
+    :param name: shared memory name
+    :param shape: array shape
+    :param dtype: array dtype
+    :return: tuple of SharedMemory and ndarray
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 tracks attached blocks and unlinks them at worker exit
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _multiply_rows(a, b, result, dtype, start, stop):
+    """
+    Computes rows of a product in a worker, in place in shared memory.
+
+    :param a, b, result: (name, shape) of shared operands and result
+    :param dtype: dtype of operands and result
+    :param start: first row
+    :param stop: row to stop at
+    :return: None
+    """
+    blocks = [_attach(name, shape, dtype) for name, shape in (a, b, result)]
+    try:
+        (_, a_), (_, b_), (_, result_) = blocks
+        np.matmul(a_[start:stop], b_, out=result_[start:stop])
+    finally:
+        del a_, b_, result_  # Release buffers before closing
+        for shm, _ in blocks:
+            shm.close()
+
+
+class SharedMultiplyPool:
+    """
+    Shared multiply pool class. Keeps a process pool alive between calls and
+    multiplies with operands in shared memory, so workers compute row blocks
+    of the result in place without pickling operands.
+    """
+    def __init__(self, workers=None, tasks_per_worker=2):
+        """
+        Constructor.
+
+        :param workers: process count, None for cpu count
+        :param tasks_per_worker: row blocks per process
+        :return: SharedMultiplyPool
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.tasks_per_worker = max(1, tasks_per_worker)
+        self._pool = multiprocessing.Pool(processes=self.workers)
+
+    def __enter__(self):
+        """
+        Enters context.
+
+        :return: SharedMultiplyPool
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+        Exits context and closes pool.
+
+        :param args: exception info
+        :return: None
+        """
+        self.close()
+
+    def multiply(self, a, b):
+        """
+        Multiplies matrices or arrays.
+
+        :param a, b: Matrix or arrays to multiply
+        :return: Matrix for Matrix input, ndarray otherwise
+        """
+        wrap = isinstance(a, Matrix)
+        a = a._matrix if isinstance(a, Matrix) else np.asarray(a)
+        b = b._matrix if isinstance(b, Matrix) else np.asarray(b)
+        if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+            raise MatrixError("Different row or column count")
+        dtype = np.result_type(a, b)
+        shapes = (a.shape, b.shape, (a.shape[0], b.shape[1]))
+        blocks = []
+        try:
+            for shape in shapes:
+                size = max(1, int(np.prod(shape)) * dtype.itemsize)
+                shm = shared_memory.SharedMemory(create=True, size=size)
+                blocks.append((shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)))
+            blocks[0][1][:] = a
+            blocks[1][1][:] = b
+            names = [(shm.name, shape) for (shm, _), shape in zip(blocks, shapes)]
+            bounds = np.linspace(0, a.shape[0], self.workers * self.tasks_per_worker + 1, dtype=int)
+            tasks = [(*names, dtype.str, int(start), int(stop)) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+            self._pool.starmap(_multiply_rows, tasks)
+            result = blocks[2][1].copy()
+        finally:
+            for shm, _ in blocks:
+                shm.close()
+                shm.unlink()
+        return Matrix(result) if wrap else result
+
+    def close(self):
+        """
+        Closes pool.
+
+        :return: None
+        """
+        self._pool.close()
+        self._pool.join()
+
+
 class MatrixError(Exception):
     """
     Matrix error class.
@@ -13,27 +215,38 @@ class MatrixError(Exception):
 
 
 class Matrix:
-    def __init__(self, matrix):
+    def __init__(self, matrix, dtype=None):
         """
-        Constructor.
+        Constructor. Stores a copy of the matrix in a contiguous array, so
+        the caller's array cannot bypass the cache.
 
-        :param matrix: matrix
+        :param matrix: list of rows or array
+        :param dtype: array dtype, None keeps the dtype of numeric arrays and uses float64 otherwise
         :return: Matrix
         """
-        self._matrix = matrix
+        try:
+            array = np.asarray(matrix)
+            if dtype is None:  # Fixed-width integers from lists could overflow silently
+                dtype = array.dtype if isinstance(matrix, np.ndarray) and array.dtype.kind in "iuf" else np.float64
+            self._matrix = np.array(array, dtype=dtype, order="C")  # Always copies
+        except (TypeError, ValueError):
+            raise MatrixError("Invalid matrix")
         if not self._validate():
             raise MatrixError("Invalid matrix")
+        self._cache = {}  # Factorizations, cleared on every change
 
     def __getitem__(self, item):
         """
         Numpy-like getter.
 
         :param item: index
-        :return: list or int
+        :return: read-only ndarray row or number
         """
-        if isinstance(item, int):
+        if isinstance(item, (int, np.integer)):
             if 0 <= item < self.row_count:
-                return self._matrix[item]
+                row = self._matrix[item]
+                row.flags.writeable = False  # Changes must go through the setter
+                return row
             else:
                 raise IndexError("Index out of range")
         elif isinstance(item, tuple):
@@ -55,7 +268,8 @@ class Matrix:
         :param value: value to set index to
         :return: None
         """
-        if isinstance(key, int):
+        self._cache.clear()
+        if isinstance(key, (int, np.integer)):
             if 0 <= key < self.row_count:
                 self._matrix[key] = value
             else:
@@ -78,6 +292,8 @@ class Matrix:
         :param other: other matrix
         :return: Matrix
         """
+        if isinstance(other, SparseMatrix):
+            return other + self
         if not isinstance(other, Matrix):
             raise ArithmeticError("Invalid type")
         return self._add(other)
@@ -89,6 +305,8 @@ class Matrix:
         :param other: other matrix
         :return: Matrix
         """
+        if isinstance(other, SparseMatrix):
+            return other * -1 + self
         if not isinstance(other, Matrix):
             raise ArithmeticError("Invalid type")
         return self._subtract(other)
@@ -102,7 +320,9 @@ class Matrix:
         """
         if isinstance(other, Matrix):
             return self._multiply(other)
-        if isinstance(other, int) or isinstance(other, float):
+        if isinstance(other, SparseMatrix):  # (A * S) = (S^T * A^T)^T
+            return (other.transpose() * self.transpose()).transpose()
+        if isinstance(other, (int, float, np.number)):
             return self._multiply_scalar(other)
         raise ArithmeticError("Invalid type")
 
@@ -122,7 +342,7 @@ class Matrix:
 
         :return: int
         """
-        return len(self._matrix)
+        return self._matrix.shape[0]
 
     @property
     def col_count(self):
@@ -131,7 +351,16 @@ class Matrix:
 
         :return: int
         """
-        return len(self[0])
+        return self._matrix.shape[1]
+
+    @property
+    def dtype(self):
+        """
+        Returns dtype of the storage array.
+
+        :return: dtype
+        """
+        return self._matrix.dtype
 
     @property
     def regular(self):
@@ -202,12 +431,7 @@ class Matrix:
 
         :return: bool
         """
-        if not (isinstance(self._matrix, list) and isinstance(self[0], list)):
-            return False
-        for row in self._matrix:
-            if len(row) != self.col_count:
-                return False
-        return True
+        return self._matrix.ndim == 2 and self._matrix.size > 0
 
     @staticmethod
     def create(rows, cols, default=0, unit=False):
@@ -223,18 +447,9 @@ class Matrix:
         if rows <= 0 or cols <= 0:
             raise MatrixError("Invalid row or column count")
         if not unit:  # Empty matrix
-            result = list()
-            for r in range(rows):
-                result.append(list())
-                for c in range(cols):
-                    result[r].append(default)
-            return Matrix(result)
+            return Matrix(np.full((rows, cols), default, dtype=np.float64))
         else:  # Unit matrix
-            result = Matrix.create(rows, cols)
-            for r in range(rows):
-                for c in range(cols):
-                    result[r, c] = 0 if r != c else 1
-            return result
+            return Matrix(np.eye(rows, cols))
 
     def print_rows(self):
         """
@@ -243,7 +458,7 @@ class Matrix:
         :return: None
         """
         for row in self._matrix:
-            print(row)
+            print(row.tolist())
 
     def duplicate(self):
         """
@@ -251,7 +466,7 @@ class Matrix:
 
         :return: Matrix
         """
-        return Matrix(self._matrix[:])
+        return Matrix(self._matrix)
 
     def transpose(self):
         """
@@ -259,11 +474,7 @@ class Matrix:
 
         :return: Matrix
         """
-        result = Matrix.create(self.col_count, self.row_count)
-        for r in range(result.row_count):
-            for c in range(result.col_count):
-                result[c, r] = self[r, c]
-        return result
+        return Matrix(self._matrix.T)
 
     def _add(self, other):
         """
@@ -274,11 +485,7 @@ class Matrix:
         """
         if self.row_count != other.row_count or self.col_count != other.col_count:
             raise MatrixError("Different row or column count")
-        result = self.duplicate()
-        for r in range(0, result.row_count):
-            for c in range(0, result.col_count):
-                result[r, c] += other[r, c]
-        return result
+        return Matrix(self._matrix + other._matrix)
 
     def _subtract(self, other):
         """
@@ -289,11 +496,7 @@ class Matrix:
         """
         if self.row_count != other.row_count or self.col_count != other.col_count:
             raise MatrixError("Different row or column count")
-        result = self.duplicate()
-        for r in range(0, result.row_count):
-            for c in range(0, result.col_count):
-                result[r, c] -= other[r, c]
-        return result
+        return Matrix(self._matrix - other._matrix)
 
     def _multiply(self, other):
         """
@@ -302,16 +505,9 @@ class Matrix:
         :param other: other matrix
         :return: Matrix
         """
-        if self.row_count != other.col_count or self.col_count != other.row_count:
+        if self.col_count != other.row_count:
             raise MatrixError("Different row or column count")
-        result = self.duplicate()
-        for r in range(result.row_count):
-            for c in range(other.col_count):
-                sum_ = 0
-                for i in range(result.col_count):
-                    sum_ += result[r, i] * other[i, c]
-                result[r, c] = sum_
-        return result
+        return Matrix(multiply_strassen(self._matrix, other._matrix))
 
     def _multiply_scalar(self, scalar):
         """
@@ -320,32 +516,222 @@ class Matrix:
         :param scalar: scalar to multiply
         :return: Matrix
         """
-        result = self.duplicate()
-        for r in range(result.row_count):
-            for c in range(result.col_count):
-                result[r, c] *= scalar
-        return result
+        return Matrix(self._matrix * scalar)
 
-    def _determinant(self, result=0):
+    def _integral(self):
         """
-        Calculates determinant recursively.
+        Checks if all entries are integers, stored as integers or as floats
+        small enough to be exact.
 
-        :param result: final result
-        :return: int
+        :return: bool
+        """
+        if self.dtype.kind in "iu":
+            return True
+        return bool(np.all(np.abs(self._matrix) <= 2 ** 53) and np.all(self._matrix == np.rint(self._matrix)))
+
+    def _int_rows(self):
+        """
+        Converts an integral matrix into rows of Python ints.
+
+        :return: list
+        """
+        if self.dtype.kind in "iu":
+            return self._matrix.tolist()
+        return self._matrix.astype(np.int64).tolist()
+
+    def _determinant(self):
+        """
+        Calculates determinant. Integral matrices use the fraction-free
+        Bareiss algorithm for exact results, others an LU factorization.
+
+        :return: int or float
         """
         if not self.square:
             raise MatrixError("No square matrix")
-        if self.row_count == 1:
-            result += self[0, 0]
-        else:
-            for r in range(self.row_count):
-                matrix = self.duplicate()
-                for c in range(self.col_count):  # Delete first column
-                    del matrix._matrix[c][0]
-                del matrix._matrix[r]  # Delete r-th row
-                # Multiply sign and factor for deleted row / column with smaller determinant
-                result += pow(-1, r + 2) * self[r, 0] * Matrix._determinant(matrix)
-        return result
+        if self._cached("integral", self._integral):
+            return self._cached("bareiss", self._bareiss)[1]
+        lu, _, sign, pivots = self._cached("lu", self._lu_decompose)
+        if len(pivots) < self.row_count:
+            return 0.0
+        return sign * float(np.prod(np.diagonal(lu)))
+
+    def _bareiss(self):
+        """
+        Calculates exact rank and determinant of an integral matrix with
+        fraction-free (Bareiss) elimination in O(n^3) using Python ints.
+        Columns without a pivot are skipped, so any shape works.
+
+        :return: tuple of rank and determinant (0 unless square and regular)
+        """
+        rows = self._int_rows()  # Python ints cannot overflow
+        n, m = len(rows), len(rows[0])
+        sign = 1
+        prev = 1
+        r = 0
+        for k in range(m):
+            if r == n:
+                break
+            for p in range(r, n):  # First row without zero
+                if rows[p][k] != 0:
+                    break
+            else:
+                continue
+            if p != r:
+                rows[r], rows[p] = rows[p], rows[r]
+                sign = -sign
+            pivot = rows[r]
+            for row in rows[r + 1:]:
+                factor = row[k]
+                for c in range(k + 1, m):
+                    row[c] = (row[c] * pivot[k] - factor * pivot[c]) // prev  # Division is exact
+            prev = pivot[k]
+            r += 1
+        return r, sign * prev if r == n == m else 0
+
+    def _modular(self):
+        """
+        Calculates rank and determinant of an integral matrix modulo MODULUS
+        with vectorized elimination in O(n^3). The rank is a lower bound of
+        the exact rank, so full rank proves it without big integers.
+
+        :return: tuple of rank and determinant modulo MODULUS
+        """
+        a = np.array([[x % MODULUS for x in row] for row in self._int_rows()], dtype=np.int64)
+        n, m = a.shape
+        det = 1
+        r = 0
+        for k in range(m):
+            if r == n:
+                break
+            candidates = np.flatnonzero(a[r:, k])
+            if not len(candidates):
+                continue
+            p = r + int(candidates[0])
+            if p != r:
+                a[[r, p]] = a[[p, r]]
+                det = -det
+            det = det * int(a[r, k]) % MODULUS
+            factors = a[r + 1:, k] * pow(int(a[r, k]), -1, MODULUS) % MODULUS
+            a[r + 1:, k:] -= factors[:, None] * a[r, k:]  # Stays above -2^62
+            a[r + 1:, k:] %= MODULUS
+            r += 1
+        return r, det % MODULUS if r == n == m else 0
+
+    def _lu_decompose(self):
+        """
+        Calculates LU factorization with partial pivoting in O(n^3). L (unit
+        diagonal, below) and U (echelon form) share one array with rows
+        permuted as P * A = L * U. Columns without a pivot above the tolerance
+        are skipped, so the pivot count is the rank.
+
+        :return: tuple of combined LU array, row permutation, sign and pivot columns
+        """
+        lu = self._matrix.astype(np.float64)
+        rows, cols = lu.shape
+        tolerance = np.finfo(np.float64).eps * max(rows, cols) * np.abs(lu).max()
+        perm = np.arange(rows)
+        sign = 1
+        pivots = []
+        r = 0
+        for k in range(cols):
+            if r == rows:
+                break
+            pivot = r + int(np.argmax(np.abs(lu[r:, k])))
+            if abs(lu[pivot, k]) <= tolerance:  # No pivot in this column
+                continue
+            if pivot != r:
+                lu[[r, pivot]] = lu[[pivot, r]]
+                perm[[r, pivot]] = perm[[pivot, r]]
+                sign = -sign
+            lu[r + 1:, k] /= lu[r, k]
+            lu[r + 1:, k + 1:] -= np.outer(lu[r + 1:, k], lu[r, k + 1:])
+            pivots.append(k)
+            r += 1
+        return lu, perm, sign, pivots
+
+    def _qr_decompose(self):
+        """
+        Calculates reduced QR factorization.
+
+        :return: tuple of Q and R arrays
+        """
+        return np.linalg.qr(self._matrix.astype(np.float64))
+
+    def _cholesky_decompose(self):
+        """
+        Calculates Cholesky factorization of a symmetric positive definite
+        matrix.
+
+        :return: lower triangular array
+        """
+        matrix = self._matrix.astype(np.float64)
+        if not self.square or not np.allclose(matrix, matrix.T):
+            raise MatrixError("No symmetric matrix")
+        try:
+            return np.linalg.cholesky(matrix)
+        except np.linalg.LinAlgError:
+            raise MatrixError("No positive definite matrix")
+
+    def _cached(self, name, func):
+        """
+        Returns cached result or computes it.
+
+        :param name: cache key
+        :param func: function computing the result
+        :return: result
+        """
+        if name not in self._cache:
+            self._cache[name] = func()
+        return self._cache[name]
+
+    def _lu_solve(self, b):
+        """
+        Solves A * X = B with the cached LU factorization in O(n^2) per column.
+
+        :param b: right-hand side array with one column per system
+        :return: ndarray
+        """
+        lu, perm, _, _ = self._cached("lu", self._lu_decompose)
+        x = np.array(b, dtype=np.float64)[perm]
+        n = self.row_count
+        for r in range(1, n):  # Forward substitution with unit L
+            x[r] -= lu[r, :r] @ x[:r]
+        for r in range(n - 1, -1, -1):  # Back substitution with U
+            x[r] -= lu[r, r + 1:] @ x[r + 1:]
+            x[r] /= lu[r, r]
+        return x
+
+    def lu(self):
+        """
+        Returns cached LU factorization with P * A = L * U.
+
+        :return: tuple of Matrix P, L and U
+        """
+        lu, perm, _, pivots = self._cached("lu", self._lu_decompose)
+        rows, cols = lu.shape
+        lower = np.eye(rows)
+        upper = np.zeros((rows, cols))
+        for r, k in enumerate(pivots):
+            lower[r + 1:, r] = lu[r + 1:, k]
+            upper[r, k:] = lu[r, k:]
+        return Matrix(np.eye(rows)[perm]), Matrix(lower), Matrix(upper)
+
+    def qr(self):
+        """
+        Returns cached reduced QR factorization with A = Q * R.
+
+        :return: tuple of Matrix Q and R
+        """
+        q, r = self._cached("qr", self._qr_decompose)
+        return Matrix(q), Matrix(r)
+
+    def cholesky(self):
+        """
+        Returns cached Cholesky factorization with A = L * L^T.
+
+        :return: Matrix L
+        """
+        return Matrix(self._cached("cholesky", self._cholesky_decompose))
 
     def _regular(self):
         """
@@ -354,9 +740,11 @@ class Matrix:
         :return: bool
         """
         # Regular matrix = invertible square matrix (determinant != 0)
-        if self.square:
-            return self.determinant != 0
-        return False
+        if not self.square:
+            return False
+        if self._cached("integral", self._integral) and self._cached("modular", self._modular)[1]:
+            return True  # Skips the big integer determinant
+        return self.determinant != 0
 
     def _singular(self):
         """
@@ -366,7 +754,7 @@ class Matrix:
         """
         # Singular matrix = not invertible square matrix (determinant == 0)
         if self.square:
-            return self.determinant == 0
+            return not self._regular()
         else:
             return False
 
@@ -378,8 +766,8 @@ class Matrix:
         :param row2: second row index
         :return: None
         """
-        for c in range(self.col_count):
-            self[row2, c] += self[row1, c]
+        self._cache.clear()
+        self._matrix[row2] += self._matrix[row1]
 
     def _add_external_row(self, row, ex_row):
         """
@@ -391,8 +779,8 @@ class Matrix:
         """
         if self.col_count != ex_row.col_count:
             raise MatrixError("Different column count")
-        for c in range(self.col_count):
-            self[row, c] += ex_row[0, c]
+        self._cache.clear()
+        self._matrix[row] += ex_row._matrix[0]
 
     def _change_rows(self, row1, row2):
         """
@@ -402,7 +790,8 @@ class Matrix:
         :param row2: second row index
         :return: None
         """
-        self[row1], self[row2] = self[row2], self[row1]
+        self._cache.clear()
+        self._matrix[[row1, row2]] = self._matrix[[row2, row1]]
 
     def _duplicate_row(self, row):
         """
@@ -411,10 +800,7 @@ class Matrix:
         :param row: row index
         :return: Matrix
         """
-        result = Matrix.create(1, self.col_count)
-        for c in range(self.col_count):
-            result[0, c] = self[row, c]
-        return result
+        return Matrix(self._matrix[row:row + 1])
 
     def _multiply_row_scalar(self, row, scalar):
         """
@@ -424,8 +810,8 @@ class Matrix:
         :param scalar: scalar to multiply
         :return: None
         """
-        for c in range(self.col_count):
-            self[row, c] *= scalar
+        self._cache.clear()
+        self._matrix[row] *= scalar
 
     def gauss(self, rnd=True, digits=8):
         """
@@ -438,7 +824,7 @@ class Matrix:
         if self.is_row or self.is_col:
             raise MatrixError("Gaussian elimination is not defined for row or column matrices")
 
-        result = self.duplicate()
+        result = Matrix(self._matrix.astype(np.float64))  # Row operations need floats
         for r in range(result.row_count):
             if result[r, r] == 0:  # Change rows to eliminate zero
                 if r < result.row_count - 1:  # Check if it is the last line
@@ -456,9 +842,7 @@ class Matrix:
                     result._multiply_row_scalar(r2, (-1) / result[r2, r])  # [r2, r] in target row to -1
                     result._add_rows(r, r2)
         if rnd:
-            for r in range(result.row_count):
-                for c in range(result.col_count):
-                    result[r, c] = round(result[r, c], digits)
+            result._matrix.round(digits, out=result._matrix)
         return result
 
     def gauss_jordan(self, rnd=True, digits=8):
@@ -477,12 +861,10 @@ class Matrix:
         for r in range(result.row_count - 1, -1, -1):  # Reverse gauss
             for c in range(r - 1, -1, -1):
                 row = result._duplicate_row(r)  # Duplicate base row
-                row.multiply_scalar((-1) * result[c, r])  # Multiply with negative value above
+                row._multiply_row_scalar(0, (-1) * result[c, r])  # Multiply with negative value above
                 result._add_external_row(c, row)  # Add to get zero
         if rnd:
-            for r in range(result.row_count):
-                for c in range(result.col_count):
-                    result[r, c] = round(result[r, c], digits)
+            result._matrix.round(digits, out=result._matrix)
         return result
 
     def _combine(self, other):
@@ -494,12 +876,7 @@ class Matrix:
         """
         if self.row_count != other.row_count:
             raise MatrixError("Different row count")
-        result = Matrix.create(self.row_count, self.col_count + other.col_count)
-        for r in range(result.row_count):
-            for c in range(result.col_count):
-                result[r, c] = self[r, c]
-                result[r, c + other.col_count] = other[r, c]
-        return result
+        return Matrix(np.hstack((self._matrix, other._matrix)))
 
     def invert(self, rnd=True, digits=8):
         """
@@ -509,30 +886,436 @@ class Matrix:
         :param digits: digits to round to
         :return: Matrix
         """
-        if not (self.square and self.regular):
+        self._check_solvable()
+        result = self._solve(np.eye(self.row_count))
+        if rnd:
+            result.round(digits, out=result)
+        return Matrix(result)
+
+    def _check_solvable(self):
+        """
+        Checks that the matrix is regular.
+
+        :return: None
+        """
+        if not self.square:
+            raise MatrixError("No square matrix")
+        if not self.regular:
             raise MatrixError("No regular square matrix")
-        result = self.duplicate()
-        combined = result._combine(Matrix.create(result.row_count, result.row_count, unit=True))
-        combined = combined.gauss_jordan(rnd=rnd, digits=digits)
-        for r in range(result.row_count):  # Cut off old matrix
-            for c in range(result.col_count):
-                result[r, c] = combined[r, c + result.col_count]
-        return result
+
+    def _solve(self, b):
+        """
+        Solves A * X = B for a regular matrix with the cached LU
+        factorization, or exactly if an integral matrix is too
+        ill-conditioned for its pivots.
+
+        :param b: right-hand side array
+        :return: ndarray
+        """
+        _, _, _, pivots = self._cached("lu", self._lu_decompose)
+        if len(pivots) < self.row_count:
+            return self._fraction_solve(b)
+        return self._lu_solve(b)
+
+    def _fraction_solve(self, b):
+        """
+        Solves A * X = B with Gauss-Jordan elimination on fractions in
+        O(n^3) exact operations.
+
+        :param b: right-hand side array
+        :return: ndarray
+        """
+        rhs = np.asarray(b, dtype=np.float64)
+        n = self.row_count
+        rows = [
+            [fractions.Fraction(x) for x in row] + [fractions.Fraction(x) for x in extra]
+            for row, extra in zip(self._int_rows(), rhs.reshape(n, -1).tolist())
+        ]
+        for k in range(n):
+            p = next(r for r in range(k, n) if rows[r][k] != 0)  # Exists for regular matrices
+            rows[k], rows[p] = rows[p], rows[k]
+            pivot = rows[k][k]
+            rows[k] = [x / pivot for x in rows[k]]
+            for r in range(n):
+                if r != k and rows[r][k] != 0:
+                    factor = rows[r][k]
+                    rows[r] = [x - factor * y for x, y in zip(rows[r], rows[k])]
+        return np.array([[float(x) for x in row[n:]] for row in rows]).reshape(rhs.shape)
+
+    def solve(self, b):
+        """
+        Solves A * X = B for one or many right-hand sides with the cached
+        LU factorization, O(n^3) once and O(n^2) per right-hand side.
+
+        :param b: Matrix with one column per system, vector or array
+        :return: Matrix for Matrix input, ndarray otherwise
+        """
+        self._check_solvable()
+        rhs = b._matrix if isinstance(b, Matrix) else np.asarray(b, dtype=np.float64)
+        if rhs.ndim not in (1, 2) or rhs.shape[0] != self.row_count:
+            raise MatrixError("Different row count")
+        x = self._solve(rhs)
+        return Matrix(x) if isinstance(b, Matrix) else x
+
+    def solve_gen(self, bs):
+        """
+        Solves A * x = b for a stream of right-hand sides against the same
+        cached factorization.
+
+        :param bs: iterable of right-hand sides
+        :return: generator
+        """
+        for b in bs:
+            yield self.solve(b)
 
     def _rank(self):
         """
-        Calculates rank
+        Calculates rank, exactly for integral matrices.
 
         :return: int
         """
-        if self.is_row:
-            return 1
-        rank = self.row_count
-        matrix = self.gauss()
-        for r in range(matrix.row_count):
-            for c in range(matrix.col_count):
-                if matrix[r, c] != 0:  # Check if element is unequal to zero
-                    break  # Continue with next line
-                if c == matrix.col_count - 1:  # Count rank down if whole line is zero
-                    rank -= 1
-        return rank
+        if self._cached("integral", self._integral):
+            rank, _ = self._cached("modular", self._modular)
+            if rank == min(self.row_count, self.col_count):
+                return rank
+            return self._cached("bareiss", self._bareiss)[0]
+        _, _, _, pivots = self._cached("lu", self._lu_decompose)
+        return len(pivots)
+
+
+class SparseMatrix:
+    """
+    Sparse matrix base class. Stores only nonzero entries, arithmetic is
+    carried out in CSR format.
+    """
+    def __init__(self, shape):
+        """
+        Constructor.
+
+        :param shape: (rows, cols) tuple
+        :return: SparseMatrix
+        """
+        rows, cols = shape
+        if rows <= 0 or cols <= 0:
+            raise MatrixError("Invalid row or column count")
+        self.shape = (int(rows), int(cols))
+
+    def __add__(self, other):
+        """
+        Adds matrices.
+
+        :param other: sparse or dense matrix
+        :return: CSRMatrix or Matrix for dense other
+        """
+        if not isinstance(other, (Matrix, SparseMatrix)):
+            raise ArithmeticError("Invalid type")
+        if self.shape != (other.row_count, other.col_count):
+            self._mismatch()
+        if isinstance(other, Matrix):
+            return Matrix(self.to_matrix()._matrix + other._matrix)
+        a, b = self.to_coo(), other.to_coo()
+        return COOMatrix(np.concatenate((a.rows, b.rows)), np.concatenate((a.cols, b.cols)),
+                         np.concatenate((a.data, b.data)), self.shape).to_csr()
+
+    def __radd__(self, other):
+        """
+        Adds matrices reversely.
+
+        :param other: sparse or dense matrix
+        :return: CSRMatrix or Matrix for dense other
+        """
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        """
+        Subtracts matrices.
+
+        :param other: sparse or dense matrix
+        :return: CSRMatrix or Matrix for dense other
+        """
+        return self.__add__(other * -1)
+
+    def __rsub__(self, other):
+        """
+        Subtracts matrices reversely.
+
+        :param other: sparse or dense matrix
+        :return: CSRMatrix or Matrix for dense other
+        """
+        return (self * -1).__add__(other)
+
+    def __mul__(self, other):
+        """
+        Multiplies with a scalar, dense or sparse matrix.
+
+        :param other: scalar, Matrix or SparseMatrix
+        :return: CSRMatrix or Matrix for dense other
+        """
+        if isinstance(other, (int, float, np.number)):
+            return self.to_csr()._multiply_scalar(other)
+        if isinstance(other, Matrix):
+            return self.to_csr()._multiply_dense(other)
+        if isinstance(other, SparseMatrix):
+            return self.to_csr()._multiply_sparse(other.to_csr())
+        raise ArithmeticError("Invalid type")
+
+    def __rmul__(self, other):
+        """
+        Multiplies with a scalar reversely.
+
+        :param other: scalar
+        :return: CSRMatrix
+        """
+        if isinstance(other, (int, float, np.number)):
+            return self.__mul__(other)
+        raise ArithmeticError("Invalid type")
+
+    def _mismatch(self):
+        """
+        Raises error for different shapes.
+
+        :return: None
+        """
+        raise MatrixError("Different row or column count")
+
+    @property
+    def row_count(self):
+        """
+        Returns row count.
+
+        :return: int
+        """
+        return self.shape[0]
+
+    @property
+    def col_count(self):
+        """
+        Returns col count.
+
+        :return: int
+        """
+        return self.shape[1]
+
+    @property
+    def nnz(self):
+        """
+        Returns amount of stored entries.
+
+        :return: int
+        """
+        return len(self.data)
+
+    @staticmethod
+    def from_matrix(matrix):
+        """
+        Creates CSR matrix from nonzero entries of a dense matrix.
+
+        :param matrix: Matrix or 2d array
+        :return: CSRMatrix
+        """
+        dense = matrix._matrix if isinstance(matrix, Matrix) else np.asarray(matrix)
+        if dense.ndim != 2:
+            raise MatrixError("Invalid matrix")
+        rows, cols = np.nonzero(dense)  # Row-major order, already canonical
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=dense.shape[0]))))
+        return CSRMatrix(dense[rows, cols], cols, indptr, dense.shape)
+
+    def to_matrix(self):
+        """
+        Converts into a dense matrix.
+
+        :return: Matrix
+        """
+        coo = self.to_coo()
+        dense = np.zeros(self.shape, dtype=coo.data.dtype)
+        np.add.at(dense, (coo.rows, coo.cols), coo.data)
+        return Matrix(dense)
+
+
+class COOMatrix(SparseMatrix):
+    """
+    Coordinate format sparse matrix class. Duplicate entries are summed on
+    conversion to CSR.
+    """
+    def __init__(self, rows, cols, data, shape):
+        """
+        Constructor.
+
+        :param rows: row index of every entry
+        :param cols: column index of every entry
+        :param data: value of every entry
+        :param shape: (rows, cols) tuple
+        :return: COOMatrix
+        """
+        super(COOMatrix, self).__init__(shape)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.data = np.asarray(data)
+        if not len(self.rows) == len(self.cols) == len(self.data):
+            raise MatrixError("Different entry count")
+        if len(self.data) and (self.rows.min() < 0 or self.rows.max() >= self.shape[0]
+                               or self.cols.min() < 0 or self.cols.max() >= self.shape[1]):
+            raise MatrixError("Index out of range")
+
+    def transpose(self):
+        """
+        Transposes matrix.
+
+        :return: COOMatrix
+        """
+        return COOMatrix(self.cols, self.rows, self.data, self.shape[::-1])
+
+    def to_coo(self):
+        """
+        Converts into COO format.
+
+        :return: COOMatrix
+        """
+        return self
+
+    def to_csr(self):
+        """
+        Converts into CSR format, sums duplicates and drops zeros.
+
+        :return: CSRMatrix
+        """
+        keys = self.rows * self.shape[1] + self.cols
+        order = np.argsort(keys, kind="stable")
+        keys, data = keys[order], self.data[order]
+        if len(keys):
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            keys, data = keys[starts], np.add.reduceat(data, starts)
+            nonzero = data != 0
+            keys, data = keys[nonzero], data[nonzero]
+        rows, cols = np.divmod(keys, self.shape[1])
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=self.shape[0]))))
+        return CSRMatrix(data, cols, indptr, self.shape)
+
+
+class CSRMatrix(SparseMatrix):
+    """
+    Compressed sparse row matrix class. Column indices are sorted and unique
+    within every row.
+    """
+    def __init__(self, data, indices, indptr, shape):
+        """
+        Constructor.
+
+        :param data: value of every entry
+        :param indices: column index of every entry
+        :param indptr: start of every row in data and indices, plus the end
+        :param shape: (rows, cols) tuple
+        :return: CSRMatrix
+        """
+        super(CSRMatrix, self).__init__(shape)
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        if len(self.indptr) != self.shape[0] + 1 or self.indptr[-1] != len(self.data) or len(self.indices) != len(self.data):
+            raise MatrixError("Invalid CSR structure")
+
+    def __getitem__(self, item):
+        """
+        Returns entry.
+
+        :param item: (row, col) tuple
+        :return: number
+        """
+        r, c = item
+        if not (0 <= r < self.shape[0] and 0 <= c < self.shape[1]):
+            raise IndexError("Index out of range")
+        start, stop = self.indptr[r], self.indptr[r + 1]
+        idx = start + np.searchsorted(self.indices[start:stop], c)
+        if idx < stop and self.indices[idx] == c:
+            return self.data[idx]
+        return self.data.dtype.type(0)
+
+    def _row_indices(self):
+        """
+        Returns row index of every entry.
+
+        :return: ndarray
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def transpose(self):
+        """
+        Transposes matrix.
+
+        :return: CSRMatrix
+        """
+        return self.to_coo().transpose().to_csr()
+
+    def to_coo(self):
+        """
+        Converts into COO format.
+
+        :return: COOMatrix
+        """
+        return COOMatrix(self._row_indices(), self.indices, self.data, self.shape)
+
+    def to_csr(self):
+        """
+        Converts into CSR format.
+
+        :return: CSRMatrix
+        """
+        return self
+
+    def _multiply_scalar(self, scalar):
+        """
+        Multiplies matrix with a scalar.
+
+        :param scalar: scalar to multiply
+        :return: CSRMatrix
+        """
+        if scalar == 0:
+            return CSRMatrix([], [], np.zeros(self.shape[0] + 1), self.shape)
+        return CSRMatrix(self.data * scalar, self.indices.copy(), self.indptr.copy(), self.shape)
+
+    def _multiply_dense(self, other):
+        """
+        Multiplies with a dense matrix, touching only stored entries. Row
+        blocks hold up to row count entries (or a single longer row), so the
+        products of one block stay within the size of the result and memory
+        stays O(nnz + output).
+
+        :param other: Matrix
+        :return: Matrix
+        """
+        if self.shape[1] != other.row_count:
+            self._mismatch()
+        dense = other._matrix
+        rows = self.shape[0]
+        result = np.zeros((rows, dense.shape[1]), dtype=np.result_type(self.data, dense))
+        start = 0
+        while start < rows:
+            stop = int(np.searchsorted(self.indptr, self.indptr[start] + rows, side="right")) - 1
+            stop = min(rows, max(stop, start + 1))  # At least one row
+            lo, hi = self.indptr[start], self.indptr[stop]
+            filled = np.flatnonzero(np.diff(self.indptr[start:stop + 1]))  # Empty rows would repeat a neighbour
+            if len(filled):
+                products = self.data[lo:hi, None] * dense[self.indices[lo:hi]]
+                result[start + filled] = np.add.reduceat(products, self.indptr[start + filled] - lo, axis=0)
+            start = stop
+        return Matrix(result)
+
+    def _multiply_sparse(self, other):
+        """
+        Multiplies with a sparse matrix by expanding every stored entry of
+        self with the matching row of other (Gustavson), so empty rows and
+        columns are never touched.
+
+        :param other: CSRMatrix
+        :return: CSRMatrix
+        """
+        if self.shape[1] != other.shape[0]:
+            self._mismatch()
+        counts = np.diff(other.indptr)[self.indices]  # Products per stored entry
+        total = int(counts.sum())
+        starts = np.repeat(other.indptr[self.indices], counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = starts + offsets
+        rows = np.repeat(self._row_indices(), counts)
+        data = np.repeat(self.data, counts) * other.data[positions]
+        return COOMatrix(rows, other.indices[positions], data, (self.shape[0], other.shape[1])).to_csr()
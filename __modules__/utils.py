@@ -1,26 +1,179 @@
+import array
+import bisect
+import collections.abc
+import concurrent.futures
+import heapq
+import itertools
+import math
+import operator
+import os
+import pickle
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _numeric(lst):
+    """
+    Converts a homogeneous numeric buffer into a one dimensional array.
+
+    :param lst: list to process
+    :return: ndarray or None
+    """
+    if np is None:
+        return None
+    if isinstance(lst, np.ndarray):
+        arr = lst
+    elif isinstance(lst, (array.array, memoryview)):
+        try:
+            arr = np.asarray(lst)  # Wraps the buffer without copying
+        except (TypeError, ValueError):
+            return None
+    else:
+        return None
+    if arr.ndim != 1 or arr.dtype.kind not in "biuf":
+        return None
+    return arr
+
+
+def _numeric_values(values):
+    """
+    Converts values into a numeric array if possible. Consumes iterators.
+
+    :param values: values to process
+    :return: ndarray or None
+    """
+    arr = _numeric(values)
+    if arr is not None:
+        return arr
+    try:
+        arr = np.asarray(list(values))
+    except (TypeError, ValueError):
+        return None
+    if arr.ndim != 1 or (arr.size and arr.dtype.kind not in "biuf"):
+        return None
+    return arr
+
+
 def remap(x, x1, x2, y1, y2):
     """
-    Remaps a value from one range to another.
+    Remaps a value or an array of values from one range to another.
 
-    :param x: value to process
+    :param x: value or array to process
     :param x1, x2: range of x
     :param y1, y2: new range
-    :return: float
+    :return: float or ndarray
     """
+    if np is not None and isinstance(x, (list, tuple, np.ndarray)):
+        return Remapper(x1, x2, y1, y2)(x)
     return (x - x1) / (x2 - x1) * (y2 - y1) + y1
 
 
-def sized_gen(lst, n):
-    """
-    Splits a list into n-sized chunks.
+class Remapper:
+    """
+    Remapper class. Folds the range arithmetic of remap into a single scale
+    and offset so repeated calls need no division.
+    """
+    def __init__(self, x1, x2, y1, y2, clamp=False, dtype=None):
+        """
+        Constructor.
+
+        :param x1, x2: range of x
+        :param y1, y2: new range
+        :param clamp: clamp results to the new range
+        :param dtype: result dtype, integer types round to nearest
+        :return: Remapper
+        """
+        if x1 == x2:
+            raise ZeroDivisionError("Empty range of x")
+        self.scale = (y2 - y1) / (x2 - x1)
+        self.offset = y1 - x1 * self.scale
+        self.clamp = clamp
+        self.dtype = dtype
+        self._low, self._high = min(y1, y2), max(y1, y2)
+
+    def __call__(self, x, out=None):
+        """
+        Remaps a value or an array of values.
+
+        :param x: value or array to process
+        :param out: float array to write the result to
+        :return: float, int or ndarray
+        """
+        if np is None or not isinstance(x, (list, tuple, np.ndarray)):
+            return self._scalar(x)
+        x = np.asarray(x, dtype=np.float64) if out is None else x
+        result = np.multiply(x, self.scale, out=out)
+        result += self.offset
+        if self.clamp:
+            np.clip(result, self._low, self._high, out=result)
+        if self.dtype is not None and np.dtype(self.dtype).kind in "iu":
+            return np.rint(result, out=result).astype(self.dtype)
+        if self.dtype is not None:
+            return result.astype(self.dtype, copy=False)
+        return result
+
+    def _scalar(self, x):
+        """
+        Remaps a single value.
+
+        :param x: value to process
+        :return: float or int
+        """
+        result = x * self.scale + self.offset
+        if self.clamp:
+            result = min(max(result, self._low), self._high)
+        if self.dtype is not None:
+            if np is not None:
+                return np.dtype(self.dtype).type(round(result) if np.dtype(self.dtype).kind in "iu" else result)
+            return self.dtype(round(result) if self.dtype is int else result)
+        return result
+
+
+def _view(lst):
+    """
+    Wraps buffers into a memoryview so slices do not copy.
 
     :param lst: list to process
+    :return: sequence or None if lst cannot be sliced
+    """
+    if isinstance(lst, (bytes, bytearray, array.array)):
+        return memoryview(lst)
+    if isinstance(lst, collections.abc.Sequence) or (np is not None and isinstance(lst, np.ndarray)):
+        return lst  # Array slices are views already
+    return None
+
+
+def sized_gen(lst, n, reuse=False):
+    """
+    Splits a list into n-sized chunks. Buffers and arrays yield views,
+    iterators of unknown length are batched lazily.
+
+    :param lst: list or iterator to process
     :param n: size of chunks
+    :param reuse: refill one list for iterator batches (consume before next)
     :return: generator
     """
-    n = min(max(1, n), len(lst))
-    for idx in range(0, len(lst), n):
-        yield lst[idx:idx + n]
+    view = _view(lst)
+    if view is None:
+        it = iter(lst)
+        n = max(1, n)
+        buffer = []
+        while True:
+            if reuse:
+                buffer[:] = itertools.islice(it, n)
+            else:
+                buffer = list(itertools.islice(it, n))
+            if not buffer:
+                return
+            yield buffer
+    else:
+        n = max(1, min(n, len(view)))
+        for idx in range(0, len(view), n):
+            yield view[idx:idx + n]
 
 
 def sized(lst, n):
@@ -36,17 +189,21 @@ def sized(lst, n):
 
 def chunk_gen(lst, n):
     """
-    Splits a list into n equally sized chunks.
+    Splits a list into n equally sized chunks. Buffers and arrays yield
+    views, iterators are materialized to get their length.
 
     :param lst: list to process
     :param n: amount of chunks
     :return: generator
     """
-    n = min(max(1, n), len(lst))
-    quo, rem = divmod(len(lst), n)
+    view = _view(lst)
+    if view is None:
+        view = list(lst)
+    n = max(1, min(n, len(view)))
+    quo, rem = divmod(len(view), n)
     idc = [quo * idx + min(idx, rem) for idx in range(n + 1)]
     for idx in range(n):
-        yield lst[idc[idx]:idc[idx + 1]]
+        yield view[idc[idx]:idc[idx + 1]]
 
 
 def chunk(lst, n):
@@ -60,75 +217,618 @@ def chunk(lst, n):
     return list(chunk_gen(lst, n))
 
 
-def unique_gen(lst, key=None):
+def balance_gen(lst, n, key, contiguous=False):
+    """
+    Splits a list into n chunks with nearly equal total cost. Items are
+    assigned greedily by descending cost (LPT) and keep their relative
+    order. Contiguous chunks are cut at prefix sums instead.
+
+    :param lst: list to process
+    :param n: amount of chunks
+    :param key: cost of an item
+    :param contiguous: keep chunks contiguous
+    :return: generator
+    """
+    lst = lst if isinstance(lst, collections.abc.Sequence) else list(lst)
+    costs = [key(x) for x in lst]
+    n = max(1, min(n, len(lst)))
+    if contiguous:
+        prefix = list(itertools.accumulate(costs))
+        total = prefix[-1] if prefix else 0
+        start = 0
+        for idx in range(1, n + 1):
+            if idx == n:
+                stop = len(lst)
+            else:
+                target = total * idx / n
+                stop = bisect.bisect_left(prefix, target)  # First index reaching target
+                if stop < len(lst) and prefix[stop] - target <= target - (prefix[stop - 1] if stop else 0):
+                    stop += 1  # Include item if it gets closer to target
+                stop = max(start, stop)
+            yield lst[start:stop]
+            start = stop
+    else:
+        heap = [(0, idx) for idx in range(n)]
+        parts = [[] for _ in range(n)]
+        for item in sorted(range(len(lst)), key=costs.__getitem__, reverse=True):
+            load, idx = heapq.heappop(heap)
+            parts[idx].append(item)
+            heapq.heappush(heap, (load + costs[item], idx))
+        for part in parts:
+            yield [lst[item] for item in sorted(part)]
+
+
+def balance(lst, n, key, contiguous=False):
+    """
+    Splits a list into n chunks with nearly equal total cost.
+
+    :param lst: list to process
+    :param n: amount of chunks
+    :param key: cost of an item
+    :param contiguous: keep chunks contiguous
+    :return: list
+    """
+    return list(balance_gen(lst, n, key, contiguous=contiguous))
+
+
+def window_gen(lst, n, step=1):
+    """
+    Creates overlapping n-sized windows. Arrays yield views, other lists
+    and iterators yield tuples from a deque.
+
+    :param lst: list or iterator to process
+    :param n: size of windows
+    :param step: distance between window starts
+    :return: generator
+    """
+    n, step = max(1, n), max(1, step)
+    arr = _numeric(lst)
+    if arr is not None:
+        if len(arr) >= n:
+            yield from np.lib.stride_tricks.sliding_window_view(arr, n)[::step]
+        return
+    window_ = collections.deque(maxlen=n)
+    for idx, x in enumerate(lst):
+        window_.append(x)
+        if idx >= n - 1 and (idx - n + 1) % step == 0:
+            yield tuple(window_)
+
+
+def window(lst, n, step=1):
+    """
+    Creates overlapping n-sized windows.
+
+    :param lst: list to process
+    :param n: size of windows
+    :param step: distance between window starts
+    :return: list or ndarray
+    """
+    arr = _numeric(lst)
+    if arr is not None:
+        n, step = max(1, n), max(1, step)
+        if len(arr) < n:
+            return np.empty((0, n), dtype=arr.dtype)
+        return np.lib.stride_tricks.sliding_window_view(arr, n)[::step]
+    return list(window_gen(lst, n, step=step))
+
+
+def rolling_sum_gen(lst, n):
+    """
+    Calculates the sum of every n-sized window in O(1) per step.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: generator
+    """
+    n = max(1, n)
+    window_ = collections.deque()
+    total = 0
+    for x in lst:
+        window_.append(x)
+        total += x
+        if len(window_) > n:
+            total -= window_.popleft()
+        if len(window_) == n:
+            yield total
+
+
+def rolling_sum(lst, n):
+    """
+    Calculates the sum of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: list or ndarray
+    """
+    arr = _numeric(lst)
+    if arr is not None:
+        n = max(1, n)
+        if len(arr) < n:
+            return np.empty(0)
+        prefix = np.concatenate(([0], np.cumsum(arr)))  # Window sums from prefix sums
+        return prefix[n:] - prefix[:-n]
+    return list(rolling_sum_gen(lst, n))
+
+
+def rolling_mean_gen(lst, n):
+    """
+    Calculates the mean of every n-sized window in O(1) per step.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: generator
+    """
+    n = max(1, n)
+    for total in rolling_sum_gen(lst, n):
+        yield total / n
+
+
+def rolling_mean(lst, n):
+    """
+    Calculates the mean of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: list or ndarray
+    """
+    if _numeric(lst) is not None:
+        return rolling_sum(lst, n) / max(1, n)
+    return list(rolling_mean_gen(lst, n))
+
+
+def _rolling_extreme_gen(lst, n, keep):
+    """
+    Calculates the extreme of every n-sized window with a monotonic deque
+    in amortized O(1) per step.
+
+    :param lst: list to process
+    :param n: size of windows
+    :param keep: keeps the last candidate if it compares to the new item
+    :return: generator
+    """
+    n = max(1, n)
+    candidates = collections.deque()  # (index, value) with monotonic values
+    for idx, x in enumerate(lst):
+        while candidates and not keep(candidates[-1][1], x):
+            candidates.pop()
+        candidates.append((idx, x))
+        if candidates[0][0] <= idx - n:
+            candidates.popleft()
+        if idx >= n - 1:
+            yield candidates[0][1]
+
+
+def _rolling_extreme(arr, n, ufunc):
+    """
+    Calculates the extreme of every n-sized window of an array with the van
+    Herk/Gil-Werman scheme, O(1) per step independent of n.
+
+    :param arr: array to process
+    :param n: size of windows
+    :param ufunc: np.minimum or np.maximum
+    :return: ndarray
+    """
+    n = max(1, n)
+    if len(arr) < n:
+        return arr[:0].copy()
+    # Pad to full blocks, padded values only ever meet their own block
+    blocks = np.pad(arr, (0, -len(arr) % n), mode="edge").reshape(-1, n)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()  # From block start
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()  # To block end
+    count = len(arr) - n + 1
+    return ufunc(suffix[:count], prefix[n - 1:n - 1 + count])
+
+
+def rolling_min_gen(lst, n):
+    """
+    Calculates the minimum of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: generator
+    """
+    return _rolling_extreme_gen(lst, n, operator.lt)
+
+
+def rolling_min(lst, n):
+    """
+    Calculates the minimum of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: list or ndarray
+    """
+    if _numeric(lst) is not None:
+        return _rolling_extreme(_numeric(lst), n, np.minimum)
+    return list(rolling_min_gen(lst, n))
+
+
+def rolling_max_gen(lst, n):
+    """
+    Calculates the maximum of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: generator
+    """
+    return _rolling_extreme_gen(lst, n, operator.gt)
+
+
+def rolling_max(lst, n):
+    """
+    Calculates the maximum of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :return: list or ndarray
+    """
+    if _numeric(lst) is not None:
+        return _rolling_extreme(_numeric(lst), n, np.maximum)
+    return list(rolling_max_gen(lst, n))
+
+
+def rolling_distinct_gen(lst, n, key=None):
+    """
+    Counts distinct values of every n-sized window in O(1) per step.
+
+    :param lst: list to process
+    :param n: size of windows
+    :param key: key to apply
+    :return: generator
+    """
+    n = max(1, n)
+    window_ = collections.deque()
+    counts = {}
+    for x in lst:
+        value = x if key is None else key(x)
+        window_.append(value)
+        counts[value] = counts.get(value, 0) + 1
+        if len(window_) > n:
+            old = window_.popleft()
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+        if len(window_) == n:
+            yield len(counts)
+
+
+def rolling_distinct(lst, n, key=None):
+    """
+    Counts distinct values of every n-sized window.
+
+    :param lst: list to process
+    :param n: size of windows
+    :param key: key to apply
+    :return: list
+    """
+    return list(rolling_distinct_gen(lst, n, key=key))
+
+
+class BloomFilter:
+    """
+    Bloom filter class. Set-like container with bounded memory which can be
+    passed as seen set to unique_gen and duplicates_gen. Membership tests may
+    return false positives at the configured rate, but never false negatives.
+    """
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        Constructor.
+
+        :param capacity: expected amount of added values
+        :param error_rate: false positive rate at capacity
+        :return: BloomFilter
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._array = bytearray((self._bits + 7) // 8)
+        self._set = 0
+        self._count = 0
+
+    def __len__(self):
+        """
+        Returns amount of added values.
+
+        :return: int
+        """
+        return self._count
+
+    def __contains__(self, value):
+        """
+        Checks if value has probably been added.
+
+        :param value: value to check
+        :return: bool
+        """
+        array_ = self._array
+        for bit in self._positions(value):
+            if not array_[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    @property
+    def size(self):
+        """
+        Returns memory footprint of the bit array in bytes.
+
+        :return: int
+        """
+        return len(self._array)
+
+    @property
+    def saturation(self):
+        """
+        Returns fraction of set bits.
+
+        :return: float
+        """
+        return self._set / self._bits
+
+    @property
+    def false_positive_rate(self):
+        """
+        Returns current false positive rate based on saturation.
+
+        :return: float
+        """
+        return self.saturation ** self._hashes
+
+    def _positions(self, value):
+        """
+        Calculates bit positions using double hashing.
+
+        :param value: value to hash
+        :return: generator
+        """
+        h = hash(value) & 0xFFFFFFFFFFFFFFFF
+        h = (h ^ (h >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF  # Splitmix64 finalizer
+        h = (h ^ (h >> 27)) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+        h ^= h >> 31
+        h1 = h & 0xFFFFFFFF
+        h2 = h >> 32 | 1
+        for idx in range(self._hashes):
+            yield (h1 + idx * h2) % self._bits
+
+    def add(self, value):
+        """
+        Adds value.
+
+        :param value: value to add
+        :return: None
+        """
+        array_ = self._array
+        for bit in self._positions(value):
+            byte, flag = bit >> 3, 1 << (bit & 7)
+            if not array_[byte] & flag:
+                array_[byte] |= flag
+                self._set += 1
+        self._count += 1
+
+
+def freeze(x):
+    """
+    Converts unhashable lists, dicts, sets and other iterables recursively
+    into hashable tuples and frozensets tagged with their type.
+
+    :param x: value to process
+    :return: hashable value
+    """
+    try:
+        hash(x)
+        return x
+    except TypeError:
+        pass
+    if isinstance(x, dict):
+        return dict, frozenset((k, freeze(v)) for k, v in x.items())
+    if isinstance(x, (set, frozenset)):
+        return type(x), frozenset(freeze(y) for y in x)
+    if isinstance(x, collections.abc.Iterable):
+        return type(x), tuple(freeze(y) for y in x)
+    raise TypeError("Cannot freeze type {}".format(type(x).__name__))
+
+
+def unique_gen(lst, key=None, seen=None):
     """
     Removes duplicates from a list.
 
     :param lst: list to process
     :param key: key to apply
+    :param seen: set-like container for seen values (e.g. BloomFilter)
     :return: generator
     """
-    seen = set()
+    seen = set() if seen is None else seen
+    frozen = set()  # Frozen unhashable values, kept apart from hashable ones
     if key is None:
         for x in lst:
-            if x not in seen:
+            try:
+                if x in seen:
+                    continue
                 seen.add(x)
-                yield x
+            except TypeError:
+                value = freeze(x)
+                if value in frozen:
+                    continue
+                frozen.add(value)
+            yield x
     else:
         for x in lst:
             value = key(x)
-            if value not in seen:
+            try:
+                if value in seen:
+                    continue
                 seen.add(value)
-                yield x
+            except TypeError:
+                value = freeze(value)
+                if value in frozen:
+                    continue
+                frozen.add(value)
+            yield x
 
 
-def unique(lst, key=None):
+def unique(lst, key=None, seen=None):
     """
     Removes duplicates from a list.
 
     :param lst: list to process
     :param key: key to apply
-    :return: list
+    :param seen: set-like container for seen values (e.g. BloomFilter)
+    :return: list or ndarray
     """
-    return list(unique_gen(lst, key=key))
+    arr = _numeric(lst) if key is None and seen is None else None
+    if arr is not None:
+        _, idx = np.unique(arr, return_index=True)
+        return arr[np.sort(idx)]  # Keep first-seen order
+    return list(unique_gen(lst, key=key, seen=seen))
 
 
-def duplicates_gen(lst, key=None):
+def duplicates_gen(lst, key=None, seen=None, yielded=None, sorted=False):
     """
     Finds duplicates in a list.
 
     :param lst: list to process
     :param key: key to apply
+    :param seen: set-like container for seen values (e.g. BloomFilter)
+    :param yielded: set-like container for yielded values (e.g. BloomFilter)
+    :param sorted: list is sorted by key, scan runs without a set
     :return: generator
     """
-    seen = set()
-    yielded = set()
+    if sorted:
+        yield from _merge_duplicates_gen(lst, key)
+        return
+    seen = set() if seen is None else seen
+    yielded = set() if yielded is None else yielded
+    frozen_seen = set()  # Frozen unhashable values, kept apart from hashable ones
+    frozen_yielded = set()
+    for x in lst:
+        value = x if key is None else key(x)
+        try:
+            duplicate = value in seen and value not in yielded
+            (yielded if duplicate else seen).add(value)
+        except TypeError:
+            value = freeze(value)
+            duplicate = value in frozen_seen and value not in frozen_yielded
+            (frozen_yielded if duplicate else frozen_seen).add(value)
+        if duplicate:
+            yield x
+
+
+def duplicates(lst, key=None, seen=None, yielded=None, sorted=False):
+    """
+    Finds duplicates in a list.
+
+    :param lst: list to process
+    :param key: key to apply
+    :param seen: set-like container for seen values (e.g. BloomFilter)
+    :param yielded: set-like container for yielded values (e.g. BloomFilter)
+    :param sorted: list is sorted by key, scan runs without a set
+    :return: list or ndarray
+    """
+    arr = _numeric(lst) if key is None and seen is None and yielded is None else None
+    if arr is not None:
+        order = np.argsort(arr, kind="stable")
+        srt = arr[order]
+        same = srt[1:] == srt[:-1]
+        second = same.copy()  # Second occurrence of each value
+        second[1:] &= ~same[:-1]
+        return arr[np.sort(order[1:][second])]
+    return list(duplicates_gen(lst, key=key, seen=seen, yielded=yielded, sorted=sorted))
+
+
+def _numeric_groups(arr):
+    """
+    Groups a numeric array in first-seen order.
+
+    :param arr: array to process
+    :return: tuple of values and first indices in first-seen order, inverse, sorted counts and group order
+    """
+    values, first_, inverse, counts = np.unique(arr, return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(first_, kind="stable")  # Groups in first-seen order
+    return values[order], first_[order], inverse, counts, order
+
+
+def group_by(lst, key=None):
+    """
+    Groups indices by value in a single pass. Groups are in first-seen
+    order and their lengths are the counts.
+
+    :param lst: list to process
+    :param key: key to apply
+    :return: dict
+    """
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        values, _, inverse, counts, order = _numeric_groups(arr)
+        positions = np.argsort(inverse, kind="stable")  # Indices sorted by group
+        splits = np.split(positions, np.cumsum(counts)[:-1])
+        return {values[idx].item(): splits[group] for idx, group in enumerate(order)}
+    groups = {}
+    if key is None:
+        for idx, x in enumerate(lst):
+            groups.setdefault(x, []).append(idx)
+    else:
+        for idx, x in enumerate(lst):
+            groups.setdefault(key(x), []).append(idx)
+    return groups
+
+
+def count_by(lst, key=None):
+    """
+    Counts occurrences of values in first-seen order.
+
+    :param lst: list to process
+    :param key: key to apply
+    :return: dict
+    """
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        values, _, _, counts, order = _numeric_groups(arr)
+        return dict(zip(values.tolist(), counts[order].tolist()))
+    counts = {}
     if key is None:
         for x in lst:
-            if x in seen and x not in yielded:
-                yielded.add(x)
-                yield x
-            else:
-                seen.add(x)
+            counts[x] = counts.get(x, 0) + 1
     else:
         for x in lst:
             value = key(x)
-            if value in seen and value not in yielded:
-                yielded.add(value)
-                yield x
-            else:
-                seen.add(value)
+            counts[value] = counts.get(value, 0) + 1
+    return counts
 
 
-def duplicates(lst, key=None):
+def frequent(lst, k, key=None):
     """
-    Finds duplicates in a list.
+    Finds the k most frequent values of a stream with the space-saving
+    algorithm in O(k) memory. Counts overestimate the true count by at most
+    the count of the least frequent tracked value.
 
-    :param lst: list to process
+    :param lst: list or stream to process
+    :param k: amount of tracked values
     :param key: key to apply
-    :return: list
+    :return: list of (value, count) tuples
     """
-    return list(duplicates_gen(lst, key=key))
+    k = max(1, k)
+    counts = {}
+    heap = []  # (count, tiebreak, value), entries may be stale
+    tiebreak = itertools.count()
+    for x in lst:
+        value = x if key is None else key(x)
+        if value in counts:
+            counts[value] += 1
+        elif len(counts) < k:
+            counts[value] = 1
+            heapq.heappush(heap, (1, next(tiebreak), value))
+        else:
+            while counts[heap[0][2]] != heap[0][0]:  # Refresh stale minimum
+                heapq.heapreplace(heap, (counts[heap[0][2]], next(tiebreak), heap[0][2]))
+            count, _, evicted = heapq.heappop(heap)
+            del counts[evicted]
+            counts[value] = count + 1
+            heapq.heappush(heap, (count + 1, next(tiebreak), value))
+    return sorted(counts.items(), key=lambda item: item[1], reverse=True)
 
 
 def compact_gen(lst, key=None):
@@ -160,6 +860,286 @@ def compact(lst, key=None):
     return list(compact_gen(lst, key=key))
 
 
+class IndexedList:
+    """
+    Indexed list class. Keeps a hash index from key values to sorted
+    positions for every registered key, so equality lookups run in O(1) or
+    O(k). Every change updates indexes incrementally, keys are only applied
+    to the changed item and inserting or deleting shifts later positions.
+    """
+    def __init__(self, items=(), keys=()):
+        """
+        Constructor.
+
+        :param items: items to add
+        :param keys: keys to index, None indexes items themselves
+        :return: IndexedList
+        """
+        self._items = list(items)
+        self._indexes = {}
+        for key in keys:
+            self.add_index(key)
+
+    def __len__(self):
+        """
+        Returns item count.
+
+        :return: int
+        """
+        return len(self._items)
+
+    def __iter__(self):
+        """
+        Iterates items.
+
+        :return: iterator
+        """
+        return iter(self._items)
+
+    def __getitem__(self, item):
+        """
+        Returns item.
+
+        :param item: index or slice
+        :return: item or list
+        """
+        return self._items[item]
+
+    def __setitem__(self, key, value):
+        """
+        Sets item and updates indexes.
+
+        :param key: index to set
+        :param value: value to set index to
+        :return: None
+        """
+        if not isinstance(key, int):
+            raise IndexError("Index must be int")
+        key = self._position(key)
+        old = self._items[key]
+        self._items[key] = value
+        for func, index_ in self._indexes.items():
+            self._unlink(index_, self._value(func, old), key)
+            bisect.insort(index_.setdefault(self._value(func, value), []), key)
+
+    def __delitem__(self, key):
+        """
+        Deletes item and updates indexes. Slices rebuild them.
+
+        :param key: index or slice to delete
+        :return: None
+        """
+        if isinstance(key, slice):
+            del self._items[key]
+            self._rebuild()
+            return
+        key = self._position(key)
+        x = self._items.pop(key)
+        for func, index_ in self._indexes.items():
+            self._unlink(index_, self._value(func, x), key)
+        self._shift(key, -1)
+
+    def _position(self, idx):
+        """
+        Normalizes a negative index.
+
+        :param idx: index
+        :return: int
+        """
+        position = idx + len(self._items) if idx < 0 else idx
+        if not 0 <= position < len(self._items):
+            raise IndexError("Index out of range")
+        return position
+
+    @staticmethod
+    def _value(func, x):
+        """
+        Applies index key.
+
+        :param func: key or None
+        :param x: item
+        :return: value
+        """
+        return x if func is None else func(x)
+
+    @staticmethod
+    def _unlink(index_, value, position):
+        """
+        Removes position from an index.
+
+        :param index_: index to update
+        :param value: indexed value
+        :param position: position to remove
+        :return: None
+        """
+        positions = index_[value]
+        del positions[bisect.bisect_left(positions, position)]
+        if not positions:
+            del index_[value]
+
+    def _shift(self, start, delta):
+        """
+        Shifts indexed positions from start on.
+
+        :param start: first position to shift
+        :param delta: amount to shift by
+        :return: None
+        """
+        for index_ in self._indexes.values():
+            for positions in index_.values():
+                idx = bisect.bisect_left(positions, start)
+                if idx < len(positions):
+                    positions[idx:] = [position + delta for position in positions[idx:]]
+
+    def _build(self, func):
+        """
+        Builds index for a key.
+
+        :param func: key or None
+        :return: dict
+        """
+        index_ = {}
+        for idx, x in enumerate(self._items):
+            index_.setdefault(self._value(func, x), []).append(idx)
+        return index_
+
+    def _rebuild(self):
+        """
+        Rebuilds all indexes.
+
+        :return: None
+        """
+        for func in self._indexes:
+            self._indexes[func] = self._build(func)
+
+    def _lookup(self, value, key):
+        """
+        Finds sorted positions of items whose key equals value.
+
+        :param value: value to search
+        :param key: key to apply
+        :return: list
+        """
+        index_ = self._indexes.get(key)
+        if index_ is None:  # Not indexed, scan
+            return [idx for idx, x in enumerate(self._items) if self._value(key, x) == value]
+        return index_.get(value, [])
+
+    def add_index(self, key=None):
+        """
+        Registers an index for a key.
+
+        :param key: key to index, None indexes items themselves
+        :return: None
+        """
+        if key not in self._indexes:
+            self._indexes[key] = self._build(key)
+
+    def remove_index(self, key=None):
+        """
+        Removes the index for a key.
+
+        :param key: indexed key
+        :return: None
+        """
+        self._indexes.pop(key, None)
+
+    def append(self, x):
+        """
+        Appends item.
+
+        :param x: item to append
+        :return: None
+        """
+        self._items.append(x)
+        position = len(self._items) - 1  # Largest position keeps lists sorted
+        for func, index_ in self._indexes.items():
+            index_.setdefault(self._value(func, x), []).append(position)
+
+    def extend(self, lst):
+        """
+        Appends items.
+
+        :param lst: items to append
+        :return: None
+        """
+        for x in lst:
+            self.append(x)
+
+    def insert(self, idx, x):
+        """
+        Inserts item and updates indexes.
+
+        :param idx: index to insert at
+        :param x: item to insert
+        :return: None
+        """
+        if idx < 0:
+            idx = max(0, idx + len(self._items))
+        idx = min(idx, len(self._items))  # Clamped like list.insert
+        self._items.insert(idx, x)
+        self._shift(idx, 1)  # New item is not indexed yet
+        for func, index_ in self._indexes.items():
+            bisect.insort(index_.setdefault(self._value(func, x), []), idx)
+
+    def pop(self, idx=-1):
+        """
+        Removes and returns item.
+
+        :param idx: index to remove
+        :return: item
+        """
+        idx = self._position(idx)
+        x = self._items[idx]
+        del self[idx]
+        return x
+
+    def index(self, value, key=None):
+        """
+        Finds first index of an item whose key equals value.
+
+        :param value: value to search
+        :param key: key to apply
+        :return: int
+        """
+        positions = self._lookup(value, key)
+        return positions[0] if positions else -1
+
+    def indices(self, *values, key=None):
+        """
+        Finds all indices of items whose key equals one of the values.
+
+        :param values: values to search
+        :param key: key to apply
+        :return: list
+        """
+        if len(values) == 1:
+            return list(self._lookup(values[0], key))
+        return sorted(set().union(*(self._lookup(value, key) for value in values)))
+
+    def first(self, value, key=None):
+        """
+        Finds first item whose key equals value.
+
+        :param value: value to search
+        :param key: key to apply
+        :return: item
+        """
+        positions = self._lookup(value, key)
+        if positions:
+            return self._items[positions[0]]
+
+    def where(self, value, key=None):
+        """
+        Finds all items whose key equals value.
+
+        :param value: value to search
+        :param key: key to apply
+        :return: list
+        """
+        return [self._items[idx] for idx in self._lookup(value, key)]
+
+
 def index(lst, value, key=None):
     """
     Finds first index of value in a list.
@@ -171,6 +1151,8 @@ def index(lst, value, key=None):
     """
     if key is not None:
         value = key(value)
+    if isinstance(lst, IndexedList):
+        return lst.index(value)
     try:
         return lst.index(value)
     except ValueError:
@@ -226,33 +1208,67 @@ def indices(lst, *values, key=None):
     :param lst: list to process
     :param values: values to search
     :param key: key to apply
-    :return: list
-    """
+    :return: list or ndarray
+    """
+    if isinstance(lst, IndexedList):
+        return lst.indices(*values, key=key)
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        other = _numeric_values(values)
+        if other is not None:
+            return np.flatnonzero(np.isin(arr, other))
     return list(indices_gen(lst, *values, key=key))
 
 
-def flatten_gen(lst):
+def _nested(x, types):
     """
-    Flattens a list.
+    Checks if an item should be flattened.
+
+    :param x: item to check
+    :param types: types to flatten, None for all iterables except strings
+    :return: bool
+    """
+    if types is None:
+        return isinstance(x, collections.abc.Iterable) and not isinstance(x, (str, bytes, bytearray))
+    return isinstance(x, types)
+
+
+def flatten_gen(lst, max_depth=None, types=(list,)):
+    """
+    Flattens a list iteratively with an explicit stack.
 
     :param lst: list to process
+    :param max_depth: maximum levels to flatten, None for all
+    :param types: types to flatten, None for all iterables except strings
     :return: generator
     """
-    for x in lst:
-        if isinstance(x, list):
-            yield from flatten_gen(x)
-        else:
+    stack = [iter(lst)]
+    while stack:
+        for x in stack[-1]:
+            if (max_depth is None or len(stack) <= max_depth) and _nested(x, types):
+                stack.append(iter(x))
+                break
             yield x
+        else:
+            stack.pop()
 
 
-def flatten(lst):
+def flatten(lst, max_depth=None, types=(list,), typecode=None):
     """
-    Flattens a list.
+    Flattens a list. Numeric leaves can be written straight into an
+    array.array, numeric arrays are raveled without copying if possible.
 
     :param lst: list to process
-    :return: list
+    :param max_depth: maximum levels to flatten, None for all
+    :param types: types to flatten, None for all iterables except strings
+    :param typecode: array.array typecode for numeric leaves
+    :return: list, array or ndarray
     """
-    return list(flatten_gen(lst))
+    if np is not None and isinstance(lst, np.ndarray) and max_depth is None and lst.dtype.kind in "biuf":
+        return lst.ravel()
+    if typecode is not None:
+        return array.array(typecode, flatten_gen(lst, max_depth=max_depth, types=types))
+    return list(flatten_gen(lst, max_depth=max_depth, types=types))
 
 
 def concat_gen(lst, *others):
@@ -270,53 +1286,326 @@ def concat_gen(lst, *others):
             yield x
 
 
-def concat(lst, *others):
+class ConcatView(collections.abc.Sequence):
+    """
+    Concatenation view class. Represents many sequences as one without
+    copying them. Random access bisects the segment start offsets.
+    """
+    def __init__(self, *lsts):
+        """
+        Constructor.
+
+        :param lsts: sequences to concatenate
+        :return: ConcatView
+        """
+        self._segments = []  # (sequence, start, stop)
+        self._offsets = []  # Start offset of each segment
+        self._len = 0
+        for lst in lsts:
+            self.append(lst)
+
+    def __len__(self):
+        """
+        Returns item count.
+
+        :return: int
+        """
+        return self._len
+
+    def __getitem__(self, item):
+        """
+        Returns item or a view of a slice.
+
+        :param item: index or slice
+        :return: item, ConcatView or list for stepped slices
+        """
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._len)
+            if step != 1:
+                return [self[idx] for idx in range(start, stop, step)]
+            return self._slice(start, stop)
+        if item < 0:
+            item += self._len
+        if not 0 <= item < self._len:
+            raise IndexError("Index out of range")
+        segment = bisect.bisect_right(self._offsets, item) - 1
+        lst, start, _ = self._segments[segment]
+        return lst[start + item - self._offsets[segment]]
+
+    def __iter__(self):
+        """
+        Iterates items.
+
+        :return: generator
+        """
+        for lst, start, stop in self._segments:
+            if start == 0 and stop == len(lst):
+                yield from lst
+            else:
+                for idx in range(start, stop):
+                    yield lst[idx]
+
+    def __add__(self, other):
+        """
+        Concatenates views without copying items.
+
+        :param other: sequence to concatenate
+        :return: ConcatView
+        """
+        result = self._slice(0, self._len)
+        if isinstance(other, ConcatView):
+            for lst, start, stop in other._segments:
+                result._append(lst, start, stop)
+        else:
+            result.append(other)
+        return result
+
+    def __repr__(self):
+        """
+        Returns representation.
+
+        :return: str
+        """
+        return "ConcatView({} items in {} segments)".format(self._len, len(self._segments))
+
+    def _append(self, lst, start, stop):
+        """
+        Appends a segment.
+
+        :param lst: sequence to append
+        :param start: first index in sequence
+        :param stop: index to stop at
+        :return: None
+        """
+        if stop > start:
+            self._segments.append((lst, start, stop))
+            self._offsets.append(self._len)
+            self._len += stop - start
+
+    def _slice(self, start, stop):
+        """
+        Creates a view of a contiguous range.
+
+        :param start: first index
+        :param stop: index to stop at
+        :return: ConcatView
+        """
+        result = ConcatView()
+        if start >= stop:
+            return result
+        first_ = bisect.bisect_right(self._offsets, start) - 1
+        for segment in range(first_, len(self._segments)):
+            offset = self._offsets[segment]
+            if offset >= stop:
+                break
+            lst, lo, hi = self._segments[segment]
+            result._append(lst, lo + max(0, start - offset), min(hi, lo + stop - offset))
+        return result
+
+    def append(self, lst):
+        """
+        Appends a sequence in O(1) without copying it.
+
+        :param lst: sequence to append
+        :return: None
+        """
+        self._append(lst, 0, len(lst))
+
+    def materialize(self):
+        """
+        Copies all items into a list.
+
+        :return: list
+        """
+        return list(self)
+
+
+def concat(lst, *others, view=False):
     """
     Concatenates lists.
 
     :param lst: list to process
     :param others: lists to concatenate
-    :return: list
+    :param view: return a ConcatView instead of copying
+    :return: list, ndarray or ConcatView
     """
+    if view:
+        return ConcatView(lst, *others)
+    if _numeric(lst) is not None:
+        return np.concatenate((lst, *others))
     new = lst[:]
     for other in others:
         new.extend(other)
     return new
 
 
-def union_gen(lst, *others, key=None):
+_END = object()  # Sentinel for exhausted iterators
+
+
+def _merge_union_gen(lsts, key):
+    """
+    Creates the union of sorted lists with a k-way merge.
+
+    :param lsts: sorted lists to process
+    :param key: key to apply
+    :return: generator
+    """
+    last = _END
+    for x in heapq.merge(*lsts, key=key):
+        value = x if key is None else key(x)
+        if last is _END or value != last:
+            last = value
+            yield x
+
+
+def _merge_intersection_gen(lst, others, key):
+    """
+    Creates the intersection of sorted lists by advancing all lists in step.
+
+    :param lst: sorted list to process
+    :param others: sorted lists to intersect with
+    :param key: key to apply
+    :return: generator
+    """
+    its = [iter(other) for other in others]
+    heads = [next(it, _END) for it in its]
+    keys = [x if x is _END or key is None else key(x) for x in heads]
+    for x in _merge_union_gen([lst], key):
+        value = x if key is None else key(x)
+        found = True
+        for idx, it in enumerate(its):
+            while heads[idx] is not _END and keys[idx] < value:
+                heads[idx] = next(it, _END)
+                keys[idx] = heads[idx] if heads[idx] is _END or key is None else key(heads[idx])
+            if heads[idx] is _END:
+                return
+            if keys[idx] != value:
+                found = False
+        if found:
+            yield x
+
+
+def _merge_difference_gen(lst, other, key):
+    """
+    Creates the difference of sorted lists by advancing both lists in step.
+
+    :param lst: sorted list to process
+    :param other: sorted list to create difference with
+    :param key: key to apply
+    :return: generator
+    """
+    it = iter(other)
+    head = next(it, _END)
+    head_value = head if head is _END or key is None else key(head)
+    for x in lst:
+        value = x if key is None else key(x)
+        while head is not _END and head_value < value:
+            head = next(it, _END)
+            head_value = head if head is _END or key is None else key(head)
+        if head is _END or head_value != value:
+            yield x
+
+
+def _merge_duplicates_gen(lst, key):
+    """
+    Finds duplicates in a sorted list by scanning runs of equal values.
+
+    :param lst: sorted list to process
+    :param key: key to apply
+    :return: generator
+    """
+    last = _END
+    count = 0
+    for x in lst:
+        value = x if key is None else key(x)
+        if last is not _END and value == last:
+            count += 1
+            if count == 2:  # Yield second occurrence like duplicates_gen
+                yield x
+        else:
+            last = value
+            count = 1
+
+
+def union_gen(lst, *others, key=None, sorted=False):
     """
     Creates the union of passed lists.
 
     :param lst: list to process
     :param others: lists to unionize with
     :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
     :return: generator
     """
+    if sorted:
+        return _merge_union_gen((lst,) + others, key)
     return unique_gen(concat_gen(lst, *others), key=key)
 
 
-def union(lst, *others, key=None):
+def union(lst, *others, key=None, sorted=False):
     """
     Creates the union of passed lists.
 
     :param lst: list to process
     :param others: lists to unionize with
     :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
     :return: list
     """
-    return list(union_gen(lst, *others, key=key))
+    return list(union_gen(lst, *others, key=key, sorted=sorted))
 
 
-def difference_gen(lst, other, key=None):
+def intersection_gen(lst, *others, key=None, sorted=False):
+    """
+    Creates the intersection of passed lists.
+
+    :param lst: list to process
+    :param others: lists to intersect with
+    :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
+    :return: generator
+    """
+    if sorted:
+        yield from _merge_intersection_gen(lst, others, key)
+        return
+    seens = [set(other) if key is None else set(apply_gen(other, key)) for other in others]
+    if key is None:
+        for x in unique_gen(lst):
+            if all(x in seen for seen in seens):
+                yield x
+    else:
+        for x in unique_gen(lst, key=key):
+            value = key(x)
+            if all(value in seen for seen in seens):
+                yield x
+
+
+def intersection(lst, *others, key=None, sorted=False):
+    """
+    Creates the intersection of passed lists.
+
+    :param lst: list to process
+    :param others: lists to intersect with
+    :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
+    :return: list
+    """
+    return list(intersection_gen(lst, *others, key=key, sorted=sorted))
+
+
+def difference_gen(lst, other, key=None, sorted=False):
     """
     Creates the difference of passed lists.
 
     :param lst: list to process
     :param other: list to create difference with
     :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
     :return: generator
     """
+    if sorted:
+        yield from _merge_difference_gen(lst, other, key)
+        return
     if key is None:
         seen = set(other)
         for x in lst:
@@ -329,16 +1618,207 @@ def difference_gen(lst, other, key=None):
                 yield x
 
 
-def difference(lst, other, key=None):
+def difference(lst, other, key=None, sorted=False):
     """
     Creates the difference of passed lists.
 
     :param lst: list to process
     :param other: lists to create difference with
     :param key: key to apply
+    :param sorted: lists are sorted by key, merge them without a set
+    :return: list or ndarray
+    """
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        if _numeric(other) is None:
+            other = list(other)  # Iterators must survive a failed conversion
+        values = _numeric_values(other)
+        if values is not None:
+            return arr[~np.isin(arr, values)]
+    return list(difference_gen(lst, other, key=key, sorted=sorted))
+
+
+_SPILL_BATCH = 1024  # Records per pickled batch
+_SPILL_DEPTH = 4  # Maximum repartition depth
+_SPILL_OVERHEAD = 4  # Estimated ratio of in-memory set size to file size
+
+
+def _spill(records, directory, partitions, level):
+    """
+    Hash-partitions (value, item) records into bucket files.
+
+    :param records: records to partition
+    :param directory: directory for bucket files
+    :param partitions: amount of buckets
+    :param level: partition level used to salt the hash
     :return: list
     """
-    return list(difference_gen(lst, other, key=key))
+    directory = tempfile.mkdtemp(dir=directory)
+    paths = [os.path.join(directory, "{}.bin".format(idx)) for idx in range(partitions)]
+    buffers = [[] for _ in range(partitions)]
+    files = [open(path, "wb") for path in paths]
+    try:
+        for record in records:
+            idx = hash((level, record[0])) % partitions
+            buffer = buffers[idx]
+            buffer.append(record)
+            if len(buffer) >= _SPILL_BATCH:
+                pickle.dump(buffer, files[idx], protocol=pickle.HIGHEST_PROTOCOL)
+                buffer.clear()
+        for idx, buffer in enumerate(buffers):
+            if buffer:
+                pickle.dump(buffer, files[idx], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for fl in files:
+            fl.close()
+    return paths
+
+
+def _load(path):
+    """
+    Loads records from a bucket file.
+
+    :param path: bucket file
+    :return: generator
+    """
+    with open(path, "rb") as fl:
+        while True:
+            try:
+                batch = pickle.load(fl)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _records(lst, key):
+    """
+    Creates (value, item) records.
+
+    :param lst: list to process
+    :param key: key to apply
+    :return: generator
+    """
+    if key is None:
+        for x in lst:
+            yield x, x
+    else:
+        for x in lst:
+            yield key(x), x
+
+
+def _fits(path, memory, level):
+    """
+    Checks if a bucket can be processed in memory.
+
+    :param path: bucket file
+    :param memory: memory budget in bytes
+    :param level: partition level
+    :return: bool
+    """
+    return level >= _SPILL_DEPTH or os.path.getsize(path) * _SPILL_OVERHEAD <= memory
+
+
+def _unique_bucket(path, directory, memory, partitions, level):
+    """
+    Removes duplicates from a bucket file.
+
+    :param path: bucket file
+    :param directory: directory for bucket files
+    :param memory: memory budget in bytes
+    :param partitions: amount of buckets
+    :param level: partition level
+    :return: generator
+    """
+    if _fits(path, memory, level):
+        seen = set()
+        for value, x in _load(path):
+            if value not in seen:
+                seen.add(value)
+                yield x
+    else:
+        for sub in _spill(_load(path), directory, partitions, level + 1):
+            yield from _unique_bucket(sub, directory, memory, partitions, level + 1)
+    os.remove(path)
+
+
+def _difference_bucket(path, other, directory, memory, partitions, level):
+    """
+    Creates the difference of two bucket files.
+
+    :param path: bucket file to process
+    :param other: bucket file to create difference with
+    :param directory: directory for bucket files
+    :param memory: memory budget in bytes
+    :param partitions: amount of buckets
+    :param level: partition level
+    :return: generator
+    """
+    if _fits(other, memory, level):
+        seen = set(value for value, _ in _load(other))
+        for value, x in _load(path):
+            if value not in seen:
+                yield x
+    else:
+        subs = _spill(_load(path), directory, partitions, level + 1)
+        others = _spill(_load(other), directory, partitions, level + 1)
+        for sub, sub_other in zip(subs, others):
+            yield from _difference_bucket(sub, sub_other, directory, memory, partitions, level + 1)
+    os.remove(path)
+    os.remove(other)
+
+
+def unique_external_gen(lst, key=None, memory=2 ** 28, partitions=64, tmpdir=None):
+    """
+    Removes duplicates from a list larger than memory. Items are spilled
+    into hash-partitioned temporary files which are processed one at a time.
+    Items are yielded in first-seen order per partition.
+
+    :param lst: list to process
+    :param key: key to apply
+    :param memory: memory budget in bytes
+    :param partitions: amount of buckets per partition level
+    :param tmpdir: directory for temporary files
+    :return: generator
+    """
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        for path in _spill(_records(lst, key), directory, partitions, 0):
+            yield from _unique_bucket(path, directory, memory, partitions, 0)
+
+
+def union_external_gen(lst, *others, key=None, memory=2 ** 28, partitions=64, tmpdir=None):
+    """
+    Creates the union of passed lists larger than memory.
+
+    :param lst: list to process
+    :param others: lists to unionize with
+    :param key: key to apply
+    :param memory: memory budget in bytes
+    :param partitions: amount of buckets per partition level
+    :param tmpdir: directory for temporary files
+    :return: generator
+    """
+    return unique_external_gen(concat_gen(lst, *others), key=key, memory=memory, partitions=partitions, tmpdir=tmpdir)
+
+
+def difference_external_gen(lst, other, key=None, memory=2 ** 28, partitions=64, tmpdir=None):
+    """
+    Creates the difference of passed lists larger than memory. Both lists
+    are spilled with the same hash partitioning so only matching buckets
+    need to be compared.
+
+    :param lst: list to process
+    :param other: list to create difference with
+    :param key: key to apply
+    :param memory: memory budget in bytes
+    :param partitions: amount of buckets per partition level
+    :param tmpdir: directory for temporary files
+    :return: generator
+    """
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        paths = _spill(_records(lst, key), directory, partitions, 0)
+        others = _spill(((value, None) for value, _ in _records(other, key)), directory, partitions, 0)
+        for path, path_other in zip(paths, others):
+            yield from _difference_bucket(path, path_other, directory, memory, partitions, 0)
 
 
 def without_gen(lst, *values, key=None):
@@ -368,8 +1848,13 @@ def without(lst, *values, key=None):
     :param lst: list to process
     :param values: values to remove
     :param key: key to apply
-    :return: list
+    :return: list or ndarray
     """
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        other = _numeric_values(values)
+        if other is not None:
+            return arr[~np.isin(arr, other)]
     return list(without_gen(lst, *values, key=key))
 
 
@@ -410,29 +1895,583 @@ def where(lst, key):
     return list(where_gen(lst, key))
 
 
-def powerset_gen(lst):
+def _apply_chunk(key, chunk_):
     """
-    Calculates the powerset.
+    Applies a key to a chunk in a worker.
+
+    :param key: key to apply
+    :param chunk_: chunk to process
+    :return: list
+    """
+    return [key(x) for x in chunk_]
+
+
+def _where_chunk(key, chunk_):
+    """
+    Finds all items of a chunk which evaluate key to true in a worker.
+
+    :param key: key to evaluate
+    :param chunk_: chunk to process
+    :return: list
+    """
+    return [x for x in chunk_ if key(x)]
+
+
+def _parallel_gen(func, lst, key, workers, threads, chunksize, ordered, inflight):
+    """
+    Runs a chunk function in a pool with a bounded amount of chunks in flight.
+    Pending chunks are cancelled when the generator is closed.
 
+    :param func: chunk function
     :param lst: list to process
+    :param key: key to pass to func
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: yield in input order
+    :param inflight: maximum pending chunks, None for twice the worker count
     :return: generator
     """
-    if lst:
-        for x in powerset(lst[1:]):
-            yield x + [lst[0]]
-            yield x
-    else:
-        yield []
+    workers = workers or os.cpu_count() or 1
+    inflight = max(1, inflight or 2 * workers)
+    pool = concurrent.futures.ThreadPoolExecutor if threads else concurrent.futures.ProcessPoolExecutor
+    executor = pool(max_workers=workers)
+    pending = collections.deque()
+
+    def drain(everything):
+        """
+        Yields results of completed chunks.
+
+        :param everything: wait for all pending chunks
+        :return: generator
+        """
+        while pending:
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield from future.result()
+            if not everything and len(pending) < inflight:
+                return
+
+    try:
+        for chunk_ in sized_gen(lst, chunksize):
+            if len(pending) >= inflight:  # Backpressure
+                yield from drain(False)
+            if not threads and isinstance(chunk_, memoryview):
+                chunk_ = chunk_.tolist()  # Views cannot be pickled
+            pending.append(executor.submit(func, key, chunk_))
+        yield from drain(True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def papply_gen(lst, key, workers=None, threads=False, chunksize=1024, ordered=True, inflight=None):
+    """
+    Applies a key to a list in a process or thread pool. Process pools need
+    a picklable key.
+
+    :param lst: list to process
+    :param key: key to apply
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: yield in input order
+    :param inflight: maximum pending chunks, None for twice the worker count
+    :return: generator
+    """
+    return _parallel_gen(_apply_chunk, lst, key, workers, threads, chunksize, ordered, inflight)
+
+
+def papply(lst, key, workers=None, threads=False, chunksize=1024, ordered=True, inflight=None):
+    """
+    Applies a key to a list in a process or thread pool.
+
+    :param lst: list to process
+    :param key: key to apply
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: keep input order
+    :param inflight: maximum pending chunks, None for twice the worker count
+    :return: list
+    """
+    return list(papply_gen(lst, key, workers, threads, chunksize, ordered, inflight))
+
+
+def pwhere_gen(lst, key, workers=None, threads=False, chunksize=1024, ordered=True, inflight=None):
+    """
+    Finds all items which evaluate key to true in a process or thread pool.
+    Process pools need a picklable key.
+
+    :param lst: list to process
+    :param key: key to evaluate
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: yield in input order
+    :param inflight: maximum pending chunks, None for twice the worker count
+    :return: generator
+    """
+    return _parallel_gen(_where_chunk, lst, key, workers, threads, chunksize, ordered, inflight)
+
+
+def pwhere(lst, key, workers=None, threads=False, chunksize=1024, ordered=True, inflight=None):
+    """
+    Finds all items which evaluate key to true in a process or thread pool.
+
+    :param lst: list to process
+    :param key: key to evaluate
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: keep input order
+    :param inflight: maximum pending chunks, None for twice the worker count
+    :return: list
+    """
+    return list(pwhere_gen(lst, key, workers, threads, chunksize, ordered, inflight))
+
+
+def pfirst(lst, key, workers=None, threads=False, chunksize=1024, ordered=True, inflight=None):
+    """
+    Finds first item which evaluates key to true in a process or thread
+    pool and cancels remaining chunks once found.
+
+    :param lst: list to process
+    :param key: key to evaluate
+    :param workers: worker count, None for cpu count
+    :param threads: use threads instead of processes
+    :param chunksize: items per task
+    :param ordered: find first item in input order instead of first found
+    :param inflight: maximum pending chunks, None for twice the worker count
+    :return: item
+    """
+    results = pwhere_gen(lst, key, workers, threads, chunksize, ordered, inflight)
+    try:
+        for x in results:
+            return x
+    finally:
+        results.close()
+
+
+def _popcount(x):
+    """
+    Counts set bits.
+
+    :param x: int to process
+    :return: int
+    """
+    return bin(x).count("1")
 
 
-def powerset(lst):
+def _powerset_subset(lst, mask):
+    """
+    Creates the subset described by a bitmask.
+
+    :param lst: list to process
+    :param mask: bitmask with bit i set for lst[i]
+    :return: list
+    """
+    # Highest index first, like the recursive definition produced it
+    return [lst[idx] for idx in range(len(lst) - 1, -1, -1) if mask >> idx & 1]
+
+
+def _powerset_range(lst, start, stop):
+    """
+    Clamps a rank range to the size of the powerset.
+
+    :param lst: list to process
+    :param start: first rank
+    :param stop: rank to stop at
+    :return: tuple
+    """
+    total = 1 << len(lst)
+    stop = total if stop is None else min(max(0, stop), total)
+    return min(max(0, start), stop), stop
+
+
+def _popcount_ceil(x, count):
+    """
+    Finds the smallest number not below x with exactly count set bits.
+
+    :param x: lower bound
+    :param count: set bits, at least one
+    :return: int
+    """
+    while _popcount(x) > count:
+        x += x & -x  # Carry the lowest run of ones upwards
+    while _popcount(x) < count:
+        x |= x + 1  # Set the lowest zero bit
+    return x
+
+
+def _popcount_gen(count, start, stop):
+    """
+    Enumerates numbers with exactly count set bits in [start, stop) in
+    ascending order (Gosper's hack), O(1) per number.
+
+    :param count: set bits
+    :param start: lower bound
+    :param stop: upper bound
+    :return: generator
+    """
+    if count == 0:
+        if start <= 0 < stop:
+            yield 0
+        return
+    x = _popcount_ceil(start, count)
+    while x < stop:
+        yield x
+        low = x & -x
+        ripple = x + low
+        x = (((ripple ^ x) >> 2) // low) | ripple
+
+
+def _powerset_masks(size, min_size, max_size, start, stop):
+    """
+    Enumerates bitmasks of subsets with min_size to max_size elements in
+    rank order. Only ranks of allowed sizes are visited, so the cost follows
+    the output instead of 2^size.
+
+    :param size: length of list
+    :param min_size: minimum subset size
+    :param max_size: maximum subset size
+    :param start: first rank
+    :param stop: rank to stop at
+    :return: generator
+    """
+    full = (1 << size) - 1
+    min_size, max_size = max(0, min_size), min(size, max_size)
+    if min_size == 0 and max_size == size:
+        for rank in range(start, stop):
+            yield full - rank
+        return
+    # A rank is the complement of its mask, so it has size - count set bits
+    ranks = [_popcount_gen(size - count, start, stop) for count in range(min_size, max_size + 1)]
+    for rank in heapq.merge(*ranks):
+        yield full - rank
+
+
+def powerset_unrank(lst, rank):
+    """
+    Finds the subset at a rank of the powerset.
+
+    :param lst: list to process
+    :param rank: rank of subset
+    :return: list
+    """
+    full = (1 << len(lst)) - 1
+    if not 0 <= rank <= full:
+        raise IndexError("Rank out of range")
+    return _powerset_subset(lst, full - rank)
+
+
+def powerset_rank(lst, subset):
+    """
+    Finds the rank of a subset in the powerset.
+
+    :param lst: list to process
+    :param subset: subset to rank
+    :return: int
+    """
+    positions = {}
+    for idx in range(len(lst) - 1, -1, -1):  # Pop lowest index first
+        positions.setdefault(lst[idx], []).append(idx)
+    mask = 0
+    for x in subset:
+        try:
+            mask |= 1 << positions[x].pop()
+        except (KeyError, IndexError):
+            raise ValueError("{} is not in list".format(x))
+    return (1 << len(lst)) - 1 - mask
+
+
+def powerset_gen(lst, min_size=0, max_size=None, start=0, stop=None):
+    """
+    Calculates the powerset lazily using bitmasks. The rank range can be
+    used to split the powerset between workers.
+
+    :param lst: list to process
+    :param min_size: minimum subset size
+    :param max_size: maximum subset size
+    :param start: first rank
+    :param stop: rank to stop at
+    :return: generator
+    """
+    lst = list(lst)
+    max_size = len(lst) if max_size is None else max_size
+    start, stop = _powerset_range(lst, start, stop)
+    for mask in _powerset_masks(len(lst), min_size, max_size, start, stop):
+        yield _powerset_subset(lst, mask)
+
+
+def powerset(lst, min_size=0, max_size=None, start=0, stop=None):
     """
     Calculates the powerset.
 
     :param lst: list to process
+    :param min_size: minimum subset size
+    :param max_size: maximum subset size
+    :param start: first rank
+    :param stop: rank to stop at
     :return: list
     """
-    return list(powerset_gen(lst))
+    return list(powerset_gen(lst, min_size=min_size, max_size=max_size, start=start, stop=stop))
+
+
+def powerset_chunks(lst, n, min_size=0, max_size=None, start=0, stop=None):
+    """
+    Exports the powerset as packed bitmask matrices with up to n rows. Bit i
+    of a row (little bit order) is set if lst[i] is part of the subset.
+
+    :param lst: list to process
+    :param n: rows per chunk
+    :param min_size: minimum subset size
+    :param max_size: maximum subset size
+    :param start: first rank
+    :param stop: rank to stop at
+    :return: generator
+    """
+    if np is None:
+        raise ImportError("powerset_chunks requires numpy")
+    size = len(lst)
+    full = (1 << size) - 1
+    width = (size + 7) // 8
+    max_size = size if max_size is None else max_size
+    start, stop = _powerset_range(lst, start, stop)
+    n = max(1, n)
+    if size < 63 and min_size <= 0 and max_size >= size:  # Unfiltered ranks are contiguous
+        for lo in range(start, stop, n):
+            masks = full - np.arange(lo, min(lo + n, stop), dtype=np.int64)
+            bits = (masks[:, None] >> np.arange(size, dtype=np.int64)) & 1
+            yield np.packbits(bits.astype(np.uint8), axis=1, bitorder="little")
+        return
+    masks = _powerset_masks(size, min_size, max_size, start, stop)
+    while True:
+        rows = [mask.to_bytes(width, "little") for mask in itertools.islice(masks, n)]
+        if not rows:
+            return
+        yield np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), width)
+
+
+_POPCOUNT = bytes(bin(idx).count("1") for idx in range(256))  # Set bits per byte
+_PACK_BATCH = 1 << 16  # Bits packed at once
+
+
+class BitMask:
+    """
+    Bit mask class. Stores one bit per element in a bytearray (little bit
+    order) and can be filled incrementally from a stream of bools.
+    """
+    def __init__(self, bits=()):
+        """
+        Constructor.
+
+        :param bits: bools to add
+        :return: BitMask
+        """
+        self._bytes = bytearray()
+        self._len = 0
+        self.extend(bits)
+
+    def __len__(self):
+        """
+        Returns amount of bits.
+
+        :return: int
+        """
+        return self._len
+
+    def __getitem__(self, item):
+        """
+        Returns bit.
+
+        :param item: index
+        :return: bool
+        """
+        if item < 0:
+            item += self._len
+        if not 0 <= item < self._len:
+            raise IndexError("Index out of range")
+        return bool(self._bytes[item >> 3] & (1 << (item & 7)))
+
+    def __iter__(self):
+        """
+        Iterates bits.
+
+        :return: generator
+        """
+        for idx in range(self._len):
+            yield bool(self._bytes[idx >> 3] & (1 << (idx & 7)))
+
+    def __eq__(self, other):
+        """
+        Checks if masks are equal.
+
+        :param other: other mask
+        :return: bool
+        """
+        if not isinstance(other, BitMask):
+            return NotImplemented
+        return self._len == other._len and self._bytes == other._bytes
+
+    def __and__(self, other):
+        """
+        Combines masks with and.
+
+        :param other: other mask
+        :return: BitMask
+        """
+        return self._combine(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        """
+        Combines masks with or.
+
+        :param other: other mask
+        :return: BitMask
+        """
+        return self._combine(other, lambda a, b: a | b)
+
+    def __xor__(self, other):
+        """
+        Combines masks with xor.
+
+        :param other: other mask
+        :return: BitMask
+        """
+        return self._combine(other, lambda a, b: a ^ b)
+
+    def __invert__(self):
+        """
+        Inverts mask.
+
+        :return: BitMask
+        """
+        return self._combine(self, lambda a, _: ~a)
+
+    def _combine(self, other, operator):
+        """
+        Combines masks bytewise using big integers.
+
+        :param other: other mask
+        :param operator: operator to apply
+        :return: BitMask
+        """
+        if not isinstance(other, BitMask):
+            return NotImplemented
+        if self._len != other._len:
+            raise ValueError("Different mask length")
+        full = (1 << self._len) - 1  # Clears padding bits
+        value = operator(int.from_bytes(self._bytes, "little"), int.from_bytes(other._bytes, "little")) & full
+        result = BitMask()
+        result._bytes = bytearray(value.to_bytes(len(self._bytes), "little"))
+        result._len = self._len
+        return result
+
+    @staticmethod
+    def from_array(arr):
+        """
+        Creates mask from a bool array in one vectorized pass.
+
+        :param arr: array of bools
+        :return: BitMask
+        """
+        result = BitMask()
+        result.extend(arr)
+        return result
+
+    @property
+    def size(self):
+        """
+        Returns memory footprint of the bits in bytes.
+
+        :return: int
+        """
+        return len(self._bytes)
+
+    def append(self, bit):
+        """
+        Appends bit.
+
+        :param bit: bool to append
+        :return: None
+        """
+        if not self._len & 7:
+            self._bytes.append(0)
+        if bit:
+            self._bytes[-1] |= 1 << (self._len & 7)
+        self._len += 1
+
+    def extend(self, bits):
+        """
+        Appends bools, packing them bytewise once aligned.
+
+        :param bits: bools to append
+        :return: None
+        """
+        if np is not None and isinstance(bits, np.ndarray) and not self._len & 7:
+            bits = np.asarray(bits, dtype=bool).ravel()  # Padding bits of the last byte stay clear
+            self._bytes += np.packbits(bits, bitorder="little").tobytes()
+            self._len += len(bits)
+            return
+        it = iter(bits)
+        while self._len & 7:  # Align to full bytes
+            bit = next(it, _END)
+            if bit is _END:
+                return
+            self.append(bit)
+        while True:
+            batch = list(itertools.islice(it, _PACK_BATCH))
+            full = len(batch) & ~7
+            if np is not None:
+                packed = np.packbits(np.asarray(batch[:full], dtype=bool), bitorder="little")
+                self._bytes += packed.tobytes()
+            else:
+                for idx in range(0, full, 8):
+                    byte = 0
+                    for bit in range(8):
+                        if batch[idx + bit]:
+                            byte |= 1 << bit
+                    self._bytes.append(byte)
+            self._len += full
+            for bit in batch[full:]:
+                self.append(bit)
+            if len(batch) < _PACK_BATCH:
+                return
+
+    def count(self):
+        """
+        Counts set bits.
+
+        :return: int
+        """
+        return sum(self._bytes.translate(_POPCOUNT))
+
+    def indices_gen(self):
+        """
+        Finds indices of set bits.
+
+        :return: generator
+        """
+        for idx, byte in enumerate(self._bytes):
+            while byte:
+                low = byte & -byte  # Lowest set bit
+                yield (idx << 3) + low.bit_length() - 1
+                byte ^= low
+
+    def indices(self):
+        """
+        Finds indices of set bits.
+
+        :return: list or ndarray
+        """
+        if np is not None:
+            bits = np.unpackbits(np.frombuffer(bytes(self._bytes), dtype=np.uint8), count=self._len, bitorder="little")
+            return np.flatnonzero(bits)
+        return list(self.indices_gen())
 
 
 def mask_gen(lst, *values, key=None):
@@ -453,15 +2492,24 @@ def mask_gen(lst, *values, key=None):
             yield key(x) in values
 
 
-def mask(lst, *values, key=None):
+def mask(lst, *values, key=None, packed=False):
     """
     Creates a bool mask.
 
     :param lst: list to process
     :param values: values to mask
     :param key: key to apply
-    :return: list
-    """
+    :param packed: return a BitMask with one bit per element
+    :return: list, ndarray or BitMask
+    """
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        other = _numeric_values(values)
+        if other is not None:
+            result = np.isin(arr, other)
+            return BitMask.from_array(result) if packed else result
+    if packed:
+        return BitMask(mask_gen(lst, *values, key=key))
     return list(mask_gen(lst, *values, key=key))
 
 
@@ -481,12 +2529,230 @@ def invert_gen(lst, key=None):
             yield not key(x)
 
 
-def invert(lst, key=None):
+def invert(lst, key=None, packed=False):
     """
     Inverts a list.
 
     :param lst: list to process
     :param key: key to apply
-    :return: list
-    """
+    :param packed: return a BitMask with one bit per element
+    :return: list, ndarray or BitMask
+    """
+    if isinstance(lst, BitMask) and key is None:
+        return ~lst if packed else list(~lst)
+    arr = _numeric(lst) if key is None else None
+    if arr is not None:
+        result = np.logical_not(arr)
+        return BitMask.from_array(result) if packed else result
+    if packed:
+        return BitMask(invert_gen(lst, key=key))
     return list(invert_gen(lst, key=key))
+
+
+_SKIP = object()  # Marks elements dropped by a fused step
+
+
+def _describe(func):
+    """
+    Describes a function for query plans.
+
+    :param func: function to describe
+    :return: str
+    """
+    return getattr(func, "__name__", repr(func))
+
+
+class Query:
+    """
+    Lazy query class. Chained element-wise steps are fused into a single
+    loop which runs when the query is consumed, without intermediate lists.
+    """
+    def __init__(self, data, steps=()):
+        """
+        Constructor.
+
+        :param data: data to process
+        :param steps: (fused, description, factory) tuples
+        :return: Query
+        """
+        self._data = data
+        self._steps = tuple(steps)
+
+    def __iter__(self):
+        """
+        Evaluates the query.
+
+        :return: generator
+        """
+        it = iter(self._data)
+        funcs = []
+        for fused, _, factory in self._steps:
+            if fused:  # Factories create fresh state for every evaluation
+                funcs.append(factory())
+            else:
+                it = factory(Query._fuse(it, funcs) if funcs else it)
+                funcs = []
+        return Query._fuse(it, funcs) if funcs else it
+
+    @staticmethod
+    def _fuse(it, funcs):
+        """
+        Runs fused steps in one pass.
+
+        :param it: iterator to process
+        :param funcs: element-wise functions
+        :return: generator
+        """
+        for x in it:
+            for func in funcs:
+                x = func(x)
+                if x is _SKIP:
+                    break
+            else:
+                yield x
+
+    def _step(self, fused, description, factory):
+        """
+        Adds a step.
+
+        :param fused: step is element-wise and can be fused
+        :param description: description for query plans
+        :param factory: creates the element-wise function or wraps the iterator
+        :return: Query
+        """
+        return Query(self._data, self._steps + ((fused, description, factory),))
+
+    def where(self, key):
+        """
+        Keeps items which evaluate key to true.
+
+        :param key: key to evaluate
+        :return: Query
+        """
+        return self._step(True, "where({})".format(_describe(key)), lambda: lambda x: x if key(x) else _SKIP)
+
+    def apply(self, key):
+        """
+        Applies a key.
+
+        :param key: key to apply
+        :return: Query
+        """
+        return self._step(True, "apply({})".format(_describe(key)), lambda: key)
+
+    def compact(self, key=None):
+        """
+        Removes all falsy values.
+
+        :param key: key to apply
+        :return: Query
+        """
+        key = bool if key is None else key
+        return self._step(True, "compact({})".format(_describe(key)), lambda: lambda x: x if key(x) else _SKIP)
+
+    def without(self, *values, key=None):
+        """
+        Removes values.
+
+        :param values: values to remove
+        :param key: key to apply
+        :return: Query
+        """
+        values = set(values)
+        if key is None:
+            factory = lambda: lambda x: _SKIP if x in values else x
+        else:
+            factory = lambda: lambda x: _SKIP if key(x) in values else x
+        return self._step(True, "without({} values)".format(len(values)), factory)
+
+    def unique(self, key=None):
+        """
+        Removes duplicates.
+
+        :param key: key to apply
+        :return: Query
+        """
+        def factory():
+            seen = set()
+            frozen = set()
+
+            def step(x):
+                value = x if key is None else key(x)
+                try:
+                    if value in seen:
+                        return _SKIP
+                    seen.add(value)
+                except TypeError:
+                    value = freeze(value)
+                    if value in frozen:
+                        return _SKIP
+                    frozen.add(value)
+                return x
+
+            return step
+
+        return self._step(True, "unique({})".format("" if key is None else _describe(key)), factory)
+
+    def take(self, n):
+        """
+        Stops after n items.
+
+        :param n: amount of items
+        :return: Query
+        """
+        return self._step(False, "take({})".format(n), lambda it: itertools.islice(it, n))
+
+    def sized(self, n):
+        """
+        Splits into n-sized chunks.
+
+        :param n: size of chunks
+        :return: Query
+        """
+        return self._step(False, "sized({})".format(n), lambda it: sized_gen(it, n))
+
+    def first(self, key=None):
+        """
+        Finds first item, stops evaluation as soon as it is found.
+
+        :param key: key to evaluate
+        :return: item
+        """
+        for x in self:
+            if key is None or key(x):
+                return x
+
+    def list(self):
+        """
+        Evaluates the query into a list.
+
+        :return: list
+        """
+        return list(self)
+
+    def explain(self):
+        """
+        Describes the fused query plan.
+
+        :return: str
+        """
+        try:
+            source = "{}[{}]".format(type(self._data).__name__, len(self._data))
+        except TypeError:
+            source = type(self._data).__name__
+        lines = ["source: {}".format(source)]
+        fused = []
+        for is_fused, description, _ in self._steps:
+            if is_fused:
+                fused.append(description)
+                continue
+            if fused:
+                lines.append("fused pass: {}".format(" -> ".join(fused)))
+                fused = []
+            lines.append(description)
+        if fused:
+            lines.append("fused pass: {}".format(" -> ".join(fused)))
+        return "\n".join(lines)
+
+
+Q = Query  # Short alias for chaining
@@ -1,5 +1,6 @@
 import numpy as np
 import opensimplex as px
+import utils
 from pyprocessing import *
 
 # Configuration
@@ -13,6 +14,7 @@ simplex = px.OpenSimplex()
 FLYING = 0
 FLYING_STEP = 0.15
 OFFSET_STEP = 0.2
+HEIGHT_MAP = utils.Remapper(-1, 1, -40, 80)
 
 
 def setup():
@@ -33,9 +35,10 @@ def draw():
     for y in range(ROWS):
         xoff = 0
         for x in range(COLS):
-            terrain[x, y] = map(simplex.noise2d(xoff, yoff), -1, 1, -40, 80)
+            terrain[x, y] = simplex.noise2d(xoff, yoff)
             xoff += OFFSET_STEP
         yoff += OFFSET_STEP
+    HEIGHT_MAP(terrain, out=terrain)  # Remap whole noise field at once
 
     translate(width / 2, height / 2)
     rotateX(PI / 3)
@@ -0,0 +1,46 @@
+import argparse
+import time
+import matrix
+import numpy as np
+
+
+def measure(func, repeats):
+    """Returns best time of repeats in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def engines(blocks, thresholds):
+    """Creates (name, multiply) pairs to compare."""
+    result = [("naive", matrix.multiply_naive), ("numpy", np.matmul)]
+    for block in blocks:
+        result.append(("blocked {}".format(block), lambda a, b, block=block: matrix.multiply_blocked(a, b, block)))
+    for threshold in thresholds:
+        result.append(("strassen {}".format(threshold), lambda a, b, threshold=threshold: matrix.multiply_strassen(a, b, threshold)))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares matrix multiply engines to tune block size and Strassen threshold.")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[64, 128, 256, 512, 1024, 2048])
+    parser.add_argument("--blocks", type=lambda s: [int(x) for x in s.split(",")], default=[32, 64, 128])
+    parser.add_argument("--thresholds", type=lambda s: [int(x) for x in s.split(",")], default=[128, 256, 512, 1024])
+    parser.add_argument("--naive-limit", type=int, default=128, help="largest size for the naive loop")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        a = np.random.rand(size, size)
+        b = np.random.rand(size, size)
+        expected = a @ b
+        print("########## {0}x{0} ##########".format(size))
+        for name, func in engines(args.blocks, args.thresholds):
+            if name == "naive" and size > args.naive_limit:
+                continue
+            seconds = measure(lambda: func(a, b), args.repeats)
+            error = np.abs(func(a, b) - expected).max()
+            print("{:<16} {:>10.4f} s  max error {:.2e}".format(name, seconds, error))
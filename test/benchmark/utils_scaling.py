@@ -0,0 +1,166 @@
+import argparse
+import collections
+import json
+import random
+import statistics
+import timeit
+import numpy as np
+import utils
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+SHAPES = ("ints", "ndarray", "strings", "tuples")
+DUPLICATES = {"low": 10, "high": 0.01}  # Value range relative to size
+WINDOW_LIMIT = 10 ** 6  # Largest size for materialized windows, every item holds a 100-tuple
+MIN_TIME = 0.05  # Seconds per repeat, short calls are looped to rise above timer noise
+REFERENCE = random.Random(0).sample(range(10 ** 6), 10 ** 4)  # Sorted alongside every case to cancel machine drift
+KEYLESS = ("concat", "flatten", "sized", "chunk", "balance", "window", "rolling_sum", "rolling_mean", "rolling_min", "rolling_max")
+
+
+def consume(gen):
+    """Consumes a generator."""
+    collections.deque(gen, maxlen=0)
+
+
+def make(shape, size, duplicates):
+    """Creates benchmark data."""
+    rng = random.Random(size)
+    span = max(1, int(size * DUPLICATES[duplicates]))
+    ints = [rng.randrange(span) for _ in range(size)]
+    if shape == "strings":
+        return [str(x) for x in ints]
+    if shape == "tuples":
+        return [(x, x % 7) for x in ints]
+    if shape == "ndarray":
+        return np.array(ints, dtype=np.int64)
+    return ints
+
+
+def cost(x):
+    """Returns a small positive cost for balance."""
+    return hash(x) % 100 + 1
+
+
+def cases(data, key):
+    """Creates (name, gen, list) triples for every utils pair."""
+    half = data[:len(data) // 2]
+    values = data[:10]
+    nested = [list(data[idx:idx + 10]) for idx in range(0, len(data), 10)]
+    result = [
+        ("unique", lambda: consume(utils.unique_gen(data, key=key)), lambda: utils.unique(data, key=key)),
+        ("duplicates", lambda: consume(utils.duplicates_gen(data, key=key)), lambda: utils.duplicates(data, key=key)),
+        ("compact", lambda: consume(utils.compact_gen(data, key=key)), lambda: utils.compact(data, key=key)),
+        ("indices", lambda: consume(utils.indices_gen(data, *values, key=key)), lambda: utils.indices(data, *values, key=key)),
+        ("mask", lambda: consume(utils.mask_gen(data, *values, key=key)), lambda: utils.mask(data, *values, key=key)),
+        ("without", lambda: consume(utils.without_gen(data, *values, key=key)), lambda: utils.without(data, *values, key=key)),
+        ("invert", lambda: consume(utils.invert_gen(data, key=key)), lambda: utils.invert(data, key=key)),
+        ("union", lambda: consume(utils.union_gen(data, half, key=key)), lambda: utils.union(data, half, key=key)),
+        ("intersection", lambda: consume(utils.intersection_gen(data, half, key=key)), lambda: utils.intersection(data, half, key=key)),
+        ("difference", lambda: consume(utils.difference_gen(data, half, key=key)), lambda: utils.difference(data, half, key=key)),
+        ("apply", lambda: consume(utils.apply_gen(data, key or str)), lambda: utils.apply(data, key or str)),
+        ("where", lambda: consume(utils.where_gen(data, key or bool)), lambda: utils.where(data, key or bool)),
+        ("concat", lambda: consume(utils.concat_gen(data, half)), lambda: utils.concat(data, half)),
+        ("flatten", lambda: consume(utils.flatten_gen(nested)), lambda: utils.flatten(nested)),
+        ("sized", lambda: consume(utils.sized_gen(data, 100)), lambda: utils.sized(data, 100)),
+        ("chunk", lambda: consume(utils.chunk_gen(data, 100)), lambda: utils.chunk(data, 100)),
+        ("balance", lambda: consume(utils.balance_gen(data, 8, cost)), lambda: utils.balance(data, 8, cost)),
+        ("window", lambda: consume(utils.window_gen(data, 100)), lambda: utils.window(data, 100)),
+        ("rolling_min", lambda: consume(utils.rolling_min_gen(data, 100)), lambda: utils.rolling_min(data, 100)),
+        ("rolling_max", lambda: consume(utils.rolling_max_gen(data, 100)), lambda: utils.rolling_max(data, 100)),
+        ("rolling_distinct", lambda: consume(utils.rolling_distinct_gen(data, 100, key=key)), lambda: utils.rolling_distinct(data, 100, key=key)),
+        ("papply", lambda: consume(utils.papply_gen(data, key or str)), lambda: utils.papply(data, key or str)),
+        ("pwhere", lambda: consume(utils.pwhere_gen(data, key or bool)), lambda: utils.pwhere(data, key or bool)),
+    ]
+    if isinstance(data[0], (int, np.integer)):  # Sums need numbers
+        result += [
+            ("rolling_sum", lambda: consume(utils.rolling_sum_gen(data, 100)), lambda: utils.rolling_sum(data, 100)),
+            ("rolling_mean", lambda: consume(utils.rolling_mean_gen(data, 100)), lambda: utils.rolling_mean(data, 100)),
+        ]
+    return result
+
+
+def loops(timer):
+    """Returns loop count that runs timer for at least MIN_TIME."""
+    number = 1
+    while timer.timeit(number) < MIN_TIME:
+        number *= 2
+    return number
+
+
+def measure(func, repeats):
+    """Returns best time per call in seconds and the median ratio to the reference timed in between."""
+    timer, reference = timeit.Timer(func), timeit.Timer(lambda: sorted(REFERENCE))
+    number, reference_number = loops(timer), loops(reference)
+    seconds, ratios = [], []
+    for _ in range(repeats):
+        case = timer.timeit(number) / number
+        seconds.append(case)
+        ratios.append(case / (reference.timeit(reference_number) / reference_number))
+    return min(seconds), statistics.median(ratios)
+
+
+def run(sizes, shapes, repeats):
+    """Runs all benchmarks, returns results and (func, repeats) per label for re-measuring."""
+    results, funcs = {}, {}
+    for size in sizes:
+        for shape in shapes:
+            for duplicates in DUPLICATES:
+                data = make(shape, size, duplicates)
+                for key_name, key in (("nokey", None), ("key", hash)):
+                    for name, gen, lst in cases(data, key):
+                        if key is not None and name in KEYLESS:
+                            continue  # No key argument
+                        for variant, func in (("gen", gen), ("list", lst)):
+                            if name == "window" and variant == "list" and shape != "ndarray" and size > WINDOW_LIMIT:
+                                continue  # Does not fit into memory
+                            label = "|".join((name, variant, key_name, shape, duplicates, str(size)))
+                            funcs[label] = (func, repeats if size <= 10 ** 5 else 1)
+                            seconds, relative = measure(*funcs[label])
+                            results[label] = {"seconds": seconds, "relative": relative}
+                            print("{:<60} {:>12.6f} s {:>10.4f} x reference".format(label, seconds, relative))
+    return results, funcs
+
+
+def compare(results, baseline, threshold, funcs, retries):
+    """Flags results slower than baseline by more than threshold relative to the reference, re-measuring suspects."""
+    regressions = []
+    for label, result in results.items():
+        if label not in baseline:
+            continue
+        limit = baseline[label]["relative"] * (1 + threshold)
+        relative = result["relative"]
+        for _ in range(retries):
+            if relative <= limit:
+                break
+            relative = min(relative, measure(*funcs[label])[1])
+        if relative > limit:
+            regressions.append((label, baseline[label]["relative"], relative))
+    for label, old, new in regressions:
+        print("REGRESSION {:<60} {:.4f} x -> {:.4f} x reference ({:+.1%})".format(label, old, new, new / old - 1))
+    print("{} regressions above {:.0%}".format(len(regressions), threshold))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks utils across input sizes and key paths.")
+    parser.add_argument("--sizes", type=lambda s: [int(float(x)) for x in s.split(",")], default=SIZES)
+    parser.add_argument("--shapes", type=lambda s: s.split(","), default=SHAPES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", help="write results to a json baseline")
+    parser.add_argument("--baseline", nargs="+", help="compare results with json baselines, the slowest run per label counts")
+    parser.add_argument("--threshold", type=float, default=0.3, help="relative slowdown to flag, lower on quiet machines")
+    parser.add_argument("--retries", type=int, default=3, help="re-measurements before flagging")
+    args = parser.parse_args()
+
+    res, funcs = run(args.sizes, args.shapes, args.repeats)
+    if args.save:
+        with open(args.save, "w") as fl:
+            json.dump(res, fl, indent=2, sort_keys=True)
+    if args.baseline:
+        envelope = {}
+        for path in args.baseline:
+            with open(path) as fl:
+                for label, result in json.load(fl).items():
+                    if label not in envelope or result["relative"] > envelope[label]["relative"]:
+                        envelope[label] = result
+        if compare(res, envelope, args.threshold, funcs, args.retries):
+            raise SystemExit(1)